@@ -0,0 +1,255 @@
+"""
+Shared fixture cache for the end-to-end tests.
+
+Each test file runs in its own `uv run --script` process, so "once per session"
+means once per build of ./release/uvrun.exe: prepared layouts are cached under
+./tmp/e2e_fixtures/ and reused by every test until the binaries they were made
+from change (./tests/build.py replaces uvrun.exe on every build) or their
+contents no longer match what was requested.
+
+Binaries are placed with hardlinks, falling back to a reflink and then to a
+full copy when the source is on another filesystem. Hardlinks rather than
+symlinks: uvrun derives the script name from the path it was launched through,
+and a symlink would resolve back to uvrun.exe.
+
+Layouts are built under a lock file per layout, so test processes running
+at the same time never build or replace the same layout concurrently.
+
+Prepared directories are shared between tests and must be treated as
+read-only. Anything a test needs to write belongs in its own temp directory.
+
+Usage from a test:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from e2e_fixtures import prepared_layout, UVRUN, UV
+
+    bundle = prepared_layout('bundle', {
+        'uv.exe': UV,
+        'process_data.exe': UVRUN,
+        'process_data.py': SCRIPT_TEXT,
+        'empty_dir/': None,
+    })
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Markers for the two binaries a layout can contain
+UVRUN = '<uvrun.exe>'
+UV = '<uv.exe>'
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_ROOT = PROJECT_ROOT / 'tmp' / 'e2e_fixtures'
+
+_FICLONE = 0x40049409  # Linux ioctl: clone file extents (reflink)
+
+_build_lock = threading.Lock()
+
+
+def find_uvrun_exe():
+    """Return the absolute path of the uvrun.exe built by ./tests/build.py."""
+    uvrun_exe = PROJECT_ROOT / 'release' / 'uvrun.exe'
+    assert uvrun_exe.exists(), f"uvrun.exe not found at {uvrun_exe}"
+    return uvrun_exe
+
+
+def find_uv_exe():
+    """Locate a uv executable to bundle into layouts, or None if there is none."""
+    uv_in_path = shutil.which('uv')
+    if uv_in_path:
+        return Path(uv_in_path).resolve()
+
+    possible_uv_locations = [
+        PROJECT_ROOT / 'release' / 'uv.exe',
+        PROJECT_ROOT / 'uv.exe',
+        Path.home() / '.cargo' / 'bin' / 'uv.exe',
+    ]
+    for loc in possible_uv_locations:
+        if loc.exists():
+            return loc.resolve()
+    return None
+
+
+def _reflink(src, dst):
+    """Clone src into dst without copying data. Raises OSError if unsupported."""
+    if not sys.platform.startswith('linux'):
+        raise OSError("reflink not supported on this platform")
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def link_or_copy(src, dst):
+    """Place src at dst as a hardlink, reflink, or (last resort) a full copy."""
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        _reflink(src, dst)
+        return 'reflink'
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+def _file_signature(path):
+    """Identify a source binary by path, size and modification time."""
+    stat = os.stat(path)
+    return [str(path), stat.st_size, stat.st_mtime_ns]
+
+
+def _resolve_sources(files):
+    """Map the UVRUN/UV markers used in files to actual source paths."""
+    sources = {}
+    values = set(v for v in files.values() if isinstance(v, str))
+    if UVRUN in values:
+        sources[UVRUN] = find_uvrun_exe()
+    if UV in values:
+        uv_exe = find_uv_exe()
+        assert uv_exe is not None, "Could not find uv.exe in PATH or any known location"
+        sources[UV] = uv_exe
+    return sources
+
+
+def _layout_stamp(files, sources):
+    """Hash everything a layout depends on, so a stale cache is never reused."""
+    payload = {
+        'files': sorted((rel, value) for rel, value in files.items()),
+        'sources': {marker: _file_signature(path) for marker, path in sorted(sources.items())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def _layout_intact(layout_dir, files, sources):
+    """Check that a cached layout still holds exactly what was requested."""
+    # Nothing extra either: a stray script or uv.exe would change what the search finds
+    expected = set()
+    for rel in files:
+        parts = Path(rel.rstrip('/')).parts
+        expected.update(Path(*parts[:i]) for i in range(1, len(parts) + 1))
+    if {path.relative_to(layout_dir) for path in layout_dir.rglob('*')} != expected:
+        return False
+
+    for rel, value in files.items():
+        path = layout_dir / rel
+        if rel.endswith('/'):
+            if not path.is_dir():
+                return False
+            continue
+        if not path.is_file():
+            return False
+        if value in sources:
+            source = sources[value]
+            # A hardlink is the source itself; anything else must match byte for byte
+            if os.path.samefile(path, source):
+                continue
+            if path.stat().st_size != os.stat(source).st_size or _sha256(path) != _sha256(source):
+                return False
+        elif path.read_bytes() != value.encode('utf-8'):
+            return False
+    return True
+
+
+def _build_layout(build_dir, files, sources):
+    """Materialize a layout into build_dir."""
+    build_dir.mkdir(parents=True)
+    for rel, value in sorted(files.items()):
+        path = build_dir / rel
+        if rel.endswith('/'):
+            path.mkdir(parents=True, exist_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if value in sources:
+            link_or_copy(sources[value], path)
+        else:
+            # newline='' keeps the bytes exactly as given, for _layout_intact()
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(value)
+
+
+@contextmanager
+def _layout_lock(name):
+    """Hold the layout's lock: a thread lock within this process, a file lock across processes."""
+    CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+    with _build_lock, open(CACHE_ROOT / f"{name}.lock", 'a+') as lock_file:
+        if sys.platform == 'win32':
+            import msvcrt
+            lock_file.seek(0)
+            # LK_LOCK retries for about 10 seconds; keep waiting while another process builds
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def prepared_layout(name, files):
+    """
+    Return a cached, prepared directory containing files.
+
+    Args:
+        name: Cache directory name, unique per distinct layout
+        files: Maps relative paths to UVRUN, UV, or the text of a file.
+               Paths ending in '/' create empty directories (value ignored).
+
+    Returns:
+        Path: Absolute path of the prepared directory (treat as read-only)
+    """
+    sources = _resolve_sources(files)
+    stamp = _layout_stamp(files, sources)
+
+    layout_dir = CACHE_ROOT / name
+    stamp_file = CACHE_ROOT / f"{name}.stamp"
+
+    with _layout_lock(name):
+        if (stamp_file.exists()
+                and stamp_file.read_text(encoding='utf-8') == stamp
+                and _layout_intact(layout_dir, files, sources)):
+            return layout_dir
+
+        # Build next to the final location, then swap it in
+        build_dir = CACHE_ROOT / f"{name}.building-{os.getpid()}"
+        if build_dir.exists():
+            shutil.rmtree(build_dir)
+        _build_layout(build_dir, files, sources)
+
+        if stamp_file.exists():
+            stamp_file.unlink()
+        if layout_dir.exists():
+            shutil.rmtree(layout_dir)
+        os.replace(build_dir, layout_dir)
+        stamp_file.write_text(stamp, encoding='utf-8')
+
+    return layout_dir
+
@@ -0,0 +1,290 @@
+#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+
+"""
+Search Location Resolution Test
+
+Table-driven: every scenario places uv.exe and one or more scripts in the
+seven search locations, runs the renamed binary in its own prepared directory,
+and checks which script ran and how long the launch took.
+
+Scenarios are generated, not written by hand:
+- every combination of uv.exe location x script location
+- shadowing: the same script in two locations, the earlier one must win
+- .uvpy vs .py: whichever is found first in the search order wins; within
+  one location .uvpy is checked before .py
+- missing uv.exe / missing script must fail
+
+Latency budgets (seconds) can be raised for slow machines:
+  UVRUN_TEST_LAUNCH_BUDGET   -- scenarios that launch a script via uv (default 30)
+  UVRUN_TEST_RESOLVE_BUDGET  -- scenarios that fail during search (default 5)
+"""
+
+import sys
+# Fix Windows console encoding
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+import os
+import time
+import subprocess
+import concurrent.futures
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from e2e_fixtures import prepared_layout, find_uvrun_exe, find_uv_exe, UVRUN, UV
+
+LAUNCH_BUDGET = float(os.environ.get('UVRUN_TEST_LAUNCH_BUDGET', '30'))
+RESOLVE_BUDGET = float(os.environ.get('UVRUN_TEST_RESOLVE_BUDGET', '5'))
+
+# Search locations in the documented search order:
+# (location name, directory within the scenario layout, requirement)
+# The binary lives in app/ and is run with work/ as the current directory.
+LOCATIONS = [
+    ('cwd', 'work', '$REQ_SEARCH_001'),
+    ('cwd/bin', 'work/bin', '$REQ_SEARCH_002'),
+    ('cwd/scripts', 'work/scripts', '$REQ_SEARCH_003'),
+    ('exe', 'app', '$REQ_SEARCH_004'),
+    ('exe/bin', 'app/bin', '$REQ_SEARCH_005'),
+    ('exe/scripts', 'app/scripts', '$REQ_SEARCH_006'),
+    ('PATH', 'pathdir', '$REQ_SEARCH_007'),
+]
+LOCATION_DIRS = {name: directory for name, directory, _ in LOCATIONS}
+LOCATION_REQS = {name: req for name, _, req in LOCATIONS}
+
+SCRIPT_TEMPLATE = """#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+
+import sys
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+print("FOUND: {marker}")
+sys.exit(0)
+"""
+
+def script_marker(location, ext):
+    return f"{location}{ext}"
+
+def make_scenario(scenario_id, uv_locations, scripts, expect, reqs, budget=None):
+    """
+    Describe one scenario.
+
+    scripts is a list of (location, extension); expect is the marker of the
+    script that must run, or None for failure.
+    """
+    if budget is None:
+        budget = RESOLVE_BUDGET if expect is None else LAUNCH_BUDGET
+    return {
+        'id': scenario_id,
+        'uv_locations': uv_locations,
+        'scripts': scripts,
+        'expect': expect,
+        'reqs': reqs,
+        'budget': budget,
+    }
+
+def generate_scenarios():
+    """Generate the full search-resolution matrix."""
+    names = [name for name, _, _ in LOCATIONS]
+    scenarios = []
+
+    # Every combination of where uv.exe and the script live
+    for uv_loc in names:
+        for script_loc in names:
+            scenarios.append(make_scenario(
+                f"uv@{uv_loc} script@{script_loc}",
+                [uv_loc],
+                [(script_loc, '.py')],
+                script_marker(script_loc, '.py'),
+                [LOCATION_REQS[uv_loc], LOCATION_REQS[script_loc], '$REQ_SEARCH_010'],
+            ))
+
+    # Shadowing: the first location in search order wins
+    for i, first in enumerate(names):
+        for second in names[i + 1:]:
+            scenarios.append(make_scenario(
+                f"shadow {first} over {second}",
+                ['cwd'],
+                [(first, '.py'), (second, '.py')],
+                script_marker(first, '.py'),
+                ['$REQ_SEARCH_008', '$REQ_SEARCH_009'],
+            ))
+
+    # .uvpy vs .py: whichever is found first in the search order wins
+    for i, first in enumerate(names):
+        scenarios.append(make_scenario(
+            f"both extensions @{first}",
+            ['cwd'],
+            [(first, '.uvpy'), (first, '.py')],
+            script_marker(first, '.uvpy'),
+            ['$REQ_BASIC_007', LOCATION_REQS[first]],
+        ))
+        for second in names[i + 1:]:
+            for first_ext, second_ext in (('.py', '.uvpy'), ('.uvpy', '.py')):
+                scenarios.append(make_scenario(
+                    f"{first_ext} @{first} over {second_ext} @{second}",
+                    ['cwd'],
+                    [(first, first_ext), (second, second_ext)],
+                    script_marker(first, first_ext),
+                    ['$REQ_BASIC_007', '$REQ_SEARCH_009'],
+                ))
+
+    # Both uv.exe and the script are required
+    scenarios.append(make_scenario(
+        "no uv.exe anywhere",
+        [],
+        [('cwd', '.py')],
+        None,
+        ['$REQ_SEARCH_010'],
+    ))
+    scenarios.append(make_scenario(
+        "no script anywhere",
+        ['cwd'],
+        [],
+        None,
+        ['$REQ_SEARCH_010'],
+    ))
+
+    return scenarios
+
+def scenario_layout(index, scenario):
+    """Build (or reuse) the isolated directory tree for a scenario."""
+    files = {
+        'app/matrix.exe': UVRUN,
+        'work/': None,
+        'pathdir/': None,
+    }
+    for location in scenario['uv_locations']:
+        files[f"{LOCATION_DIRS[location]}/uv.exe"] = UV
+    for location, ext in scenario['scripts']:
+        files[f"{LOCATION_DIRS[location]}/matrix{ext}"] = SCRIPT_TEMPLATE.format(
+            marker=script_marker(location, ext)
+        )
+    return prepared_layout(f"search_matrix_{index:03d}", files)
+
+def isolated_path(pathdir):
+    """PATH with the scenario's own PATH directory first and any other uv.exe removed."""
+    inherited = [
+        entry for entry in os.environ.get('PATH', '').split(os.pathsep)
+        if entry and not (Path(entry) / 'uv.exe').exists()
+    ]
+    return os.pathsep.join([str(pathdir)] + inherited)
+
+def run_scenario(scenario, layout):
+    """Run one scenario. Returns (scenario, list of failure messages, elapsed seconds)."""
+    env = dict(os.environ)
+    env['PATH'] = isolated_path(layout / 'pathdir')
+
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [str(layout / 'app' / 'matrix.exe')],
+            cwd=str(layout / 'work'),
+            env=env,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            timeout=max(scenario['budget'] * 2, 60),
+        )
+    except subprocess.TimeoutExpired:
+        elapsed = time.perf_counter() - start
+        return scenario, [f"timed out after {elapsed:.1f}s"], elapsed
+    elapsed = time.perf_counter() - start
+
+    problems = []
+    found = [line[len("FOUND: "):].strip() for line in result.stdout.splitlines() if line.startswith("FOUND: ")]
+    expect = scenario['expect']
+
+    if expect is None:
+        if result.returncode == 0:
+            problems.append("expected failure, but the binary exited with 0")
+    else:
+        if result.returncode != 0:
+            problems.append(f"exit code {result.returncode}, stderr: {result.stderr.strip()}")
+        if len(found) != 1:
+            problems.append(f"expected exactly one script to run, got {found}")
+        elif found[0] != expect:
+            problems.append(f"expected {expect} to run, got {found[0]}")
+
+    if elapsed > scenario['budget']:
+        problems.append(f"launch took {elapsed:.2f}s, budget is {scenario['budget']:.2f}s")
+
+    return scenario, problems, elapsed
+
+def main():
+    """Test search location resolution for uv.exe and Python scripts."""
+
+    try:
+        # Verify uvrun.exe exists
+        uvrun_exe = find_uvrun_exe()
+        print(f"✓ Found uvrun.exe at {uvrun_exe}")
+
+        # Find uv.exe (we need it for the tests)
+        uv_exe = find_uv_exe()
+        if not uv_exe:
+            print("✗ ERROR: Could not find uv.exe anywhere")
+            return 1
+        print(f"✓ Found uv.exe: {uv_exe}")
+
+        scenarios = generate_scenarios()
+        print(f"\nPreparing {len(scenarios)} scenarios...")
+        layouts = [scenario_layout(i, scenario) for i, scenario in enumerate(scenarios)]
+
+        workers = min(8, os.cpu_count() or 1)
+        print(f"Running {len(scenarios)} scenarios with {workers} workers "
+              f"(launch budget {LAUNCH_BUDGET:.1f}s, resolve budget {RESOLVE_BUDGET:.1f}s)\n")
+
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_scenario, s, l) for s, l in zip(scenarios, layouts)]
+            for future in concurrent.futures.as_completed(futures):
+                results.append(future.result())
+
+        results.sort(key=lambda r: scenarios.index(r[0]))
+        failed = []
+        for scenario, problems, elapsed in results:
+            mark = "✗" if problems else "✓"
+            print(f"{mark} [{elapsed:6.2f}s] {scenario['id']}  ({', '.join(scenario['reqs'])})")
+            for problem in problems:
+                print(f"      {problem}")
+            if problems:
+                failed.append(scenario)
+
+        latencies = sorted(elapsed for _, _, elapsed in results)
+        print(f"\nLatency: min {latencies[0]:.2f}s, "
+              f"median {latencies[len(latencies) // 2]:.2f}s, max {latencies[-1]:.2f}s")
+
+        def failed_for(req):
+            return [s['id'] for s in failed if req in s['reqs']]
+
+        assert not failed_for('$REQ_SEARCH_001'), f"cwd scenarios failed: {failed_for('$REQ_SEARCH_001')}"  # $REQ_SEARCH_001
+        assert not failed_for('$REQ_SEARCH_002'), f"cwd/bin scenarios failed: {failed_for('$REQ_SEARCH_002')}"  # $REQ_SEARCH_002
+        assert not failed_for('$REQ_SEARCH_003'), f"cwd/scripts scenarios failed: {failed_for('$REQ_SEARCH_003')}"  # $REQ_SEARCH_003
+        assert not failed_for('$REQ_SEARCH_004'), f"exe scenarios failed: {failed_for('$REQ_SEARCH_004')}"  # $REQ_SEARCH_004
+        assert not failed_for('$REQ_SEARCH_005'), f"exe/bin scenarios failed: {failed_for('$REQ_SEARCH_005')}"  # $REQ_SEARCH_005
+        assert not failed_for('$REQ_SEARCH_006'), f"exe/scripts scenarios failed: {failed_for('$REQ_SEARCH_006')}"  # $REQ_SEARCH_006
+        assert not failed_for('$REQ_SEARCH_007'), f"PATH scenarios failed: {failed_for('$REQ_SEARCH_007')}"  # $REQ_SEARCH_007
+        assert not failed_for('$REQ_SEARCH_008'), f"search order scenarios failed: {failed_for('$REQ_SEARCH_008')}"  # $REQ_SEARCH_008
+        assert not failed_for('$REQ_SEARCH_009'), f"first-match scenarios failed: {failed_for('$REQ_SEARCH_009')}"  # $REQ_SEARCH_009
+        assert not failed_for('$REQ_SEARCH_010'), f"uv.exe + script scenarios failed: {failed_for('$REQ_SEARCH_010')}"  # $REQ_SEARCH_010
+        assert not failed_for('$REQ_BASIC_007'), f"extension priority scenarios failed: {failed_for('$REQ_BASIC_007')}"  # $REQ_BASIC_007
+        assert not failed, f"{len(failed)} of {len(scenarios)} scenarios failed"
+
+        print("\n✓ All tests passed")
+        return 0
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,45 +11,12 @@ if sys.stdout.encoding != 'utf-8':
     sys.stderr.reconfigure(encoding='utf-8')
 
 import subprocess
-import shutil
-import os
 from pathlib import Path
 
-def main():
-    """Test binary rename and execution flow."""
-
-    print("Starting binary rename execution test...")
-
-    # Setup paths
-    release_dir = Path('./release')
-    tmp_dir = Path('./tmp')
-    tmp_dir.mkdir(exist_ok=True)
-
-    uvrun_exe = release_dir / 'uvrun.exe'
-    renamed_exe = tmp_dir / 'myscript.exe'
-    test_script = tmp_dir / 'myscript.py'
-
-    # Track resources for cleanup
-    created_files = []
-
-    try:
-        # Verify uvrun.exe exists
-        assert uvrun_exe.exists(), f"uvrun.exe not found at {uvrun_exe}"
-        print(f"✓ Found uvrun.exe at {uvrun_exe}")
-
-        # $REQ_BASIC_001: Binary Can Be Renamed
-        print(f"\nTesting requirement $REQ_BASIC_001: Binary can be renamed...")
-        print(f"Copying {uvrun_exe} to {renamed_exe}...")
-        shutil.copy2(uvrun_exe, renamed_exe)
-        created_files.append(renamed_exe)
-        assert renamed_exe.exists(), "Failed to create renamed binary"  # $REQ_BASIC_001
-        assert renamed_exe.is_file(), "Renamed binary must be a file"  # $REQ_BASIC_001
-        print(f"✓ Successfully renamed uvrun.exe to myscript.exe")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from e2e_fixtures import prepared_layout, find_uvrun_exe, UVRUN
 
-        # Create a test Python script that the renamed binary will execute
-        # This script tests multiple requirements at once
-        print(f"\nCreating test script at {test_script}...")
-        script_content = '''#!/usr/bin/env uvrun
+MYSCRIPT_CONTENT = '''#!/usr/bin/env uvrun
 # /// script
 # requires-python = ">=3.8"
 # dependencies = []
@@ -75,10 +42,66 @@ print("STDERR: Error message from script", file=sys.stderr)
 # Test exit code
 sys.exit(42)
 '''
-        test_script.write_text(script_content, encoding='utf-8')
-        created_files.append(test_script)
+
+UVPY_CONTENT = '''#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+import sys
+print("UVPY: Executed from .uvpy file")
+sys.exit(0)
+'''
+
+PRIORITY_PY_CONTENT = '''#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+print("PRIORITY: Executed from .py file")
+'''
+
+PRIORITY_UVPY_CONTENT = '''#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+print("PRIORITY: Executed from .uvpy file")
+'''
+
+def main():
+    """Test binary rename and execution flow."""
+
+    print("Starting binary rename execution test...")
+
+    try:
+        # Verify uvrun.exe exists
+        uvrun_exe = find_uvrun_exe()
+        print(f"✓ Found uvrun.exe at {uvrun_exe}")
+
+        # $REQ_BASIC_001: Binary Can Be Renamed
+        # The shared fixture places renamed copies (hardlinks) of uvrun.exe
+        # next to the scripts they should run
+        print(f"\nTesting requirement $REQ_BASIC_001: Binary can be renamed...")
+        tmp_dir = prepared_layout('binary_rename', {
+            'myscript.exe': UVRUN,
+            'myscript.py': MYSCRIPT_CONTENT,
+            'testuvpy.exe': UVRUN,
+            'testuvpy.uvpy': UVPY_CONTENT,
+            'priority.exe': UVRUN,
+            'priority.py': PRIORITY_PY_CONTENT,
+            'priority.uvpy': PRIORITY_UVPY_CONTENT,
+        })
+        renamed_exe = tmp_dir / 'myscript.exe'
+        test_script = tmp_dir / 'myscript.py'
+        print(f"Prepared {renamed_exe} from {uvrun_exe}")
+        assert renamed_exe.exists(), "Failed to create renamed binary"  # $REQ_BASIC_001
+        assert renamed_exe.is_file(), "Renamed binary must be a file"  # $REQ_BASIC_001
+        print(f"✓ Successfully renamed uvrun.exe to myscript.exe")
+
+        # The test script exercises multiple requirements at once
         assert test_script.exists(), "Failed to create test script"
-        print(f"✓ Created test script at {test_script}")
+        print(f"✓ Test script available at {test_script}")
 
         # $REQ_BASIC_002: Derive Script Name from Binary Name
         # $REQ_BASIC_004: Search for Python Script
@@ -145,23 +168,8 @@ sys.exit(42)
         # $REQ_BASIC_006: Support .uvpy Extension
         # $REQ_BASIC_007: Extension Priority First-Found
         print(f"\nTesting .uvpy extension support...")
-        uvpy_script = tmp_dir / 'testuvpy.uvpy'
         uvpy_exe = tmp_dir / 'testuvpy.exe'
 
-        uvpy_script.write_text('''#!/usr/bin/env uvrun
-# /// script
-# requires-python = ">=3.8"
-# dependencies = []
-# ///
-import sys
-print("UVPY: Executed from .uvpy file")
-sys.exit(0)
-''', encoding='utf-8')
-        created_files.append(uvpy_script)
-
-        shutil.copy2(uvrun_exe, uvpy_exe)
-        created_files.append(uvpy_exe)
-
         print(f"Running: {uvpy_exe}")
         result = subprocess.run(
             [str(uvpy_exe)],
@@ -179,31 +187,8 @@ sys.exit(0)
 
         # Test first-found priority: if both .py and .uvpy exist, first found wins
         print(f"\nTesting extension priority (first-found wins)...")
-        priority_py = tmp_dir / 'priority.py'
-        priority_uvpy = tmp_dir / 'priority.uvpy'
         priority_exe = tmp_dir / 'priority.exe'
 
-        priority_py.write_text('''#!/usr/bin/env uvrun
-# /// script
-# requires-python = ">=3.8"
-# dependencies = []
-# ///
-print("PRIORITY: Executed from .py file")
-''', encoding='utf-8')
-        created_files.append(priority_py)
-
-        priority_uvpy.write_text('''#!/usr/bin/env uvrun
-# /// script
-# requires-python = ">=3.8"
-# dependencies = []
-# ///
-print("PRIORITY: Executed from .uvpy file")
-''', encoding='utf-8')
-        created_files.append(priority_uvpy)
-
-        shutil.copy2(uvrun_exe, priority_exe)
-        created_files.append(priority_exe)
-
         print(f"Running: {priority_exe} (both .py and .uvpy exist)")
         result = subprocess.run(
             [str(priority_exe)],
@@ -253,16 +238,5 @@ print("PRIORITY: Executed from .uvpy file")
         traceback.print_exc()
         return 1
 
-    finally:
-        # Cleanup created files
-        print(f"\nCleaning up test files...")
-        for file_path in created_files:
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-                    print(f"Removed {file_path}")
-            except Exception as e:
-                print(f"Warning: Failed to remove {file_path}: {e}")
-
 if __name__ == '__main__':
     sys.exit(main())
@@ -11,60 +11,12 @@ if sys.stdout.encoding != 'utf-8':
     sys.stderr.reconfigure(encoding='utf-8')
 
 import subprocess
-import shutil
-import os
 from pathlib import Path
 
-def main():
-    """Test portable bundle usage flow."""
-
-    bundle_dir = None
-
-    try:
-        print("Setting up test environment...", flush=True)
-
-        # Create a temporary bundle directory with timestamp to avoid Windows file locks
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        bundle_dir = Path(f'./tmp/test_bundle_{timestamp}')
-        bundle_dir.mkdir(parents=True, exist_ok=True)
-        print(f"Created bundle directory: {bundle_dir}", flush=True)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from e2e_fixtures import prepared_layout, find_uvrun_exe, find_uv_exe, UVRUN, UV
 
-        # Step 1: Create self-contained directory structure
-        print("\n[Step 1] Creating self-contained directory structure...", flush=True)
-        print("Step 1 started...", flush=True)
-
-        # Copy uv.exe to bundle directory
-        uv_source = Path('./release/uvrun.exe')
-        assert uv_source.exists(), f"uvrun.exe not found at {uv_source}"
-
-        # For testing, we need actual uv.exe
-        # First check if uv is available in PATH
-        uv_in_path = shutil.which('uv')
-        if uv_in_path:
-            uv_exe_source = Path(uv_in_path)
-            print(f"Found uv.exe in PATH at: {uv_exe_source}", flush=True)
-        else:
-            # If not in PATH, check release directory
-            uv_exe_source = Path('./release/uv.exe')
-            assert uv_exe_source.exists(), f"uv.exe not found in PATH or at {uv_exe_source}"
-            print(f"Found uv.exe at: {uv_exe_source}", flush=True)
-
-        uv_exe_dest = bundle_dir / 'uv.exe'
-        print(f"Copying from {uv_exe_source} to {uv_exe_dest}", flush=True)
-        shutil.copy2(uv_exe_source, uv_exe_dest)
-        assert uv_exe_dest.exists(), "Failed to copy uv.exe to bundle"  # $REQ_BUNDLE_001
-        print(f"Copied uv.exe to bundle: {uv_exe_dest}", flush=True)
-
-        # Copy and rename uvrun.exe to match script name
-        renamed_binary = bundle_dir / 'process_data.exe'
-        shutil.copy2(uv_source, renamed_binary)
-        assert renamed_binary.exists(), "Failed to copy renamed binary"  # $REQ_BUNDLE_001
-        print(f"Created renamed binary: {renamed_binary}", flush=True)
-
-        # Create a matching Python script
-        script_path = bundle_dir / 'process_data.py'
-        script_content = '''#!/usr/bin/env uvrun
+SCRIPT_CONTENT = '''#!/usr/bin/env uvrun
 # /// script
 # requires-python = ">=3.8"
 # dependencies = []
@@ -90,9 +42,37 @@ if len(sys.argv) > 1 and sys.argv[1] == "fail":
 else:
     sys.exit(0)
 '''
-        script_path.write_text(script_content, encoding='utf-8')
-        assert script_path.exists(), "Failed to create Python script"  # $REQ_BUNDLE_001
-        print(f"Created Python script: {script_path}", flush=True)
+
+def main():
+    """Test portable bundle usage flow."""
+
+    try:
+        print("Setting up test environment...", flush=True)
+
+        # Step 1: Create self-contained directory structure
+        print("\n[Step 1] Creating self-contained directory structure...", flush=True)
+        print("Step 1 started...", flush=True)
+
+        uvrun_exe = find_uvrun_exe()
+        print(f"Found uvrun.exe at: {uvrun_exe}", flush=True)
+
+        # For testing, we need actual uv.exe (PATH first, then ./release/)
+        uv_exe_source = find_uv_exe()
+        assert uv_exe_source is not None, "uv.exe not found in PATH or at ./release/uv.exe"
+        print(f"Found uv.exe at: {uv_exe_source}", flush=True)
+
+        # The shared fixture links uv.exe and the renamed uvrun.exe into the bundle
+        bundle_dir = prepared_layout('portable_bundle', {
+            'uv.exe': UV,
+            'process_data.exe': UVRUN,
+            'process_data.py': SCRIPT_CONTENT,
+        })
+        print(f"Prepared bundle directory: {bundle_dir}", flush=True)
+
+        renamed_binary = bundle_dir / 'process_data.exe'
+        assert (bundle_dir / 'uv.exe').exists(), "Failed to place uv.exe in bundle"  # $REQ_BUNDLE_001
+        assert renamed_binary.exists(), "Failed to place renamed binary"  # $REQ_BUNDLE_001
+        assert (bundle_dir / 'process_data.py').exists(), "Failed to create Python script"  # $REQ_BUNDLE_001
 
         print("✓ Self-contained directory structure created", flush=True)  # $REQ_BUNDLE_001
 
@@ -185,7 +165,7 @@ else:
         print("\n[Step 8] Testing execution from external location...", flush=True)
 
         # Run the binary using absolute path from a different directory
-        external_cwd = Path('./tmp')
+        external_cwd = bundle_dir.parent
         print(f"About to test from external location: {renamed_binary.resolve()}", flush=True)
         print(f"External working directory: {external_cwd}", flush=True)
         print("Starting subprocess.run() from external location...", flush=True)
@@ -214,24 +194,6 @@ else:
         import traceback
         traceback.print_exc()
         return 1
-    finally:
-        # Clean up bundle directory
-        if bundle_dir and bundle_dir.exists():
-            print(f"\nCleaning up test bundle directory: {bundle_dir}", flush=True)
-            # On Windows, files may be briefly locked. Retry a few times.
-            import time
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                try:
-                    shutil.rmtree(bundle_dir)
-                    print("✓ Cleanup completed", flush=True)
-                    break
-                except Exception as e:
-                    if attempt < max_attempts - 1:
-                        print(f"Cleanup attempt {attempt + 1} failed, retrying... ({e})", flush=True)
-                        time.sleep(0.5)
-                    else:
-                        print(f"Warning: Failed to clean up {bundle_dir} after {max_attempts} attempts: {e}", flush=True)
 
 if __name__ == '__main__':
     sys.exit(main())
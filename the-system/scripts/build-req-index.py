@@ -11,8 +11,9 @@ if sys.stdout.encoding != 'utf-8':
     sys.stderr.reconfigure(encoding='utf-8')
 
 import os
-import re
-import sqlite3
+import time
+import random
+import argparse
 from pathlib import Path
 
 # Change to project root (two levels up from this script)
@@ -20,159 +21,91 @@ script_dir = Path(__file__).parent
 project_root = script_dir.parent.parent
 os.chdir(project_root)
 
-def extract_req_locations(filepath, category):
-    """Extract all $REQ_ID tags from a file with line numbers."""
-    locations = []
+# The indexer itself lives in req_index.py so orchestrators can call it in-process
+sys.path.insert(0, str(script_dir))
+from req_index import build_index
+
+def write_benchmark_tree(root, file_count):
+    """Create a synthetic project with file_count files and sparse $REQ_ID tags."""
+    marker = root / f".complete-{file_count}"
+    if marker.exists():
+        return
+    if root.exists():
+        import shutil
+        shutil.rmtree(root)
+
+    rng = random.Random(file_count)
+    flow_count = max(1, file_count // 1000)
+    reqs_per_flow = 20
+    all_ids = [f"$REQ_BENCH{flow}_{n:03d}" for flow in range(flow_count) for n in range(1, reqs_per_flow + 1)]
+
+    (root / 'reqs').mkdir(parents=True)
+    for flow in range(flow_count):
+        lines = [f"# Benchmark Flow {flow}", "", "**Source:** ./README.md", ""]
+        for n in range(1, reqs_per_flow + 1):
+            lines += [f"## $REQ_BENCH{flow}_{n:03d}: Step {n}", "", "**Source:** ./README.md (Section: \"Bench\")", "",
+                      f"Synthetic requirement {n} of flow {flow}.", ""]
+        (root / 'reqs' / f"flow-{flow}.md").write_text("\n".join(lines), encoding='utf-8')
+
+    filler = "\n".join(f"    value_{i} = compute(value_{i - 1}, {i})" for i in range(1, 40))
+    test_count = max(1, file_count // 100)
+    code_count = file_count - flow_count - test_count
+    for i in range(test_count):
+        directory = root / 'tests' / 'passing'
+        directory.mkdir(parents=True, exist_ok=True)
+        tags = "\n".join(f"    assert check()  # {req_id}" for req_id in rng.sample(all_ids, 5))
+        (directory / f"test_{i:05d}.py").write_text(f"def main():\n{filler}\n{tags}\n", encoding='utf-8')
+    for i in range(code_count):
+        directory = root / 'code' / f"pkg{i // 500:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        # Tags are sparse in real code trees: roughly one file in twenty
+        tag = f"    # {rng.choice(all_ids)}\n" if i % 20 == 0 else ""
+        (directory / f"module_{i:05d}.py").write_text(f"def f():\n{tag}{filler}\n", encoding='utf-8')
+
+    marker.write_text("", encoding='utf-8')
+
+def run_benchmark(file_count, jobs=None):
+    """Time a full serial build against a full parallel build over a synthetic tree."""
+    root = Path('./tmp/bench-req-index').resolve()
+    print(f"Preparing synthetic tree with {file_count} files in {root}...")
+    write_benchmark_tree(root, file_count)
+
+    original_cwd = os.getcwd()
+    os.chdir(root)
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, start=1):
-                # Match $REQ_ID pattern (letters, digits, underscores, hyphens)
-                matches = re.findall(r'\$REQ_[A-Za-z0-9_-]+', line)
-                for req_id in matches:
-                    locations.append((req_id, str(filepath), line_num, category))
-    except Exception as e:
-        print(f"Warning: Could not read {filepath}: {e}", file=sys.stderr)
-    return locations
-
-def extract_req_definitions(filepath):
-    """Extract requirement definitions from a flow file in ./reqs/."""
-    definitions = []
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Split into sections by ## headers
-        # Pattern: ## $REQ_ID: Title
-        sections = re.split(r'\n##\s+(\$REQ_[A-Za-z0-9_-]+):\s*([^\n]+)', content)
-
-        # sections[0] is the preamble before first req
-        # sections[1::3] are req_ids
-        # sections[2::3] are titles
-        # sections[3::3] are the content blocks
-
-        for i in range(1, len(sections), 3):
-            if i+2 >= len(sections):
-                break
-
-            req_id = sections[i].strip()
-            title = sections[i+1].strip()
-            content_block = sections[i+2].strip()
-
-            # Extract source attribution from content
-            source_match = re.search(r'\*\*Source:\*\*\s*([^\n]+)', content_block)
-            source_attribution = source_match.group(1).strip() if source_match else ''
-
-            # Extract requirement text (everything after source line)
-            if source_match:
-                req_text = content_block[source_match.end():].strip()
-            else:
-                req_text = content_block
-
-            definitions.append((req_id, req_text, source_attribution, str(filepath)))
-
-    except Exception as e:
-        print(f"Warning: Could not parse {filepath}: {e}", file=sys.stderr)
-
-    return definitions
-
-def scan_directory(directory, extensions, category):
-    """Scan directory for files and extract $REQ_ID locations."""
-    locations = []
-    if not os.path.exists(directory):
-        return locations
-
-    for root, dirs, files in os.walk(directory):
-        for filename in files:
-            if not any(filename.endswith(ext) for ext in extensions):
-                continue
-            filepath = Path(root) / filename
-            locations.extend(extract_req_locations(filepath, category))
-
-    return locations
-
-def build_index():
-    """Build the requirements index database."""
-    # Create tmp directory
-    os.makedirs('./tmp', exist_ok=True)
-
-    # Remove existing database
-    db_path = './tmp/reqs.sqlite'
-    if os.path.exists(db_path):
-        os.remove(db_path)
-
-    # Create new database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Create tables
-    cursor.execute('''
-        CREATE TABLE req_definitions (
-            req_id TEXT PRIMARY KEY,
-            req_text TEXT NOT NULL,
-            source_attribution TEXT,
-            flow_file TEXT NOT NULL
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE req_locations (
-            req_id TEXT NOT NULL,
-            filespec TEXT NOT NULL,
-            line_num INTEGER NOT NULL,
-            category TEXT NOT NULL
-        )
-    ''')
-
-    cursor.execute('CREATE INDEX idx_loc_req_id ON req_locations(req_id)')
-    cursor.execute('CREATE INDEX idx_loc_category ON req_locations(category)')
-
-    # Scan ./reqs/ for definitions
-    definitions = []
-    if os.path.exists('./reqs'):
-        for req_file in Path('./reqs').glob('*.md'):
-            definitions.extend(extract_req_definitions(req_file))
-
-    # Insert definitions
-    cursor.executemany('''
-        INSERT INTO req_definitions (req_id, req_text, source_attribution, flow_file)
-        VALUES (?, ?, ?, ?)
-    ''', definitions)
-
-    # Scan all directories for locations
-    all_locations = []
-    all_locations.extend(scan_directory('./reqs', ['.md'], 'reqs'))
-    all_locations.extend(scan_directory('./tests', ['.py'], 'tests'))
-    all_locations.extend(scan_directory('./code', ['.py', '.cs', '.go', '.rs', '.java', '.js', '.ts', '.c', '.cpp', '.h'], 'code'))
-
-    # Insert locations
-    cursor.executemany('''
-        INSERT INTO req_locations (req_id, filespec, line_num, category)
-        VALUES (?, ?, ?, ?)
-    ''', all_locations)
-
-    conn.commit()
-
-    # Print summary
-    cursor.execute('SELECT COUNT(DISTINCT req_id) FROM req_definitions')
-    def_count = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "reqs"')
-    reqs_loc_count = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "tests"')
-    tests_loc_count = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "code"')
-    code_loc_count = cursor.fetchone()[0]
-
-    conn.close()
-
-    print(f"Requirements index built: {db_path}")
-    print(f"  Definitions: {def_count} unique $REQ_IDs")
-    print(f"  Locations:   {reqs_loc_count} in ./reqs/, {tests_loc_count} in ./tests/, {code_loc_count} in ./code/")
+        timings = []
+        for label, label_jobs in (('serial', 1), ('parallel', jobs or os.cpu_count() or 1)):
+            start_time = time.perf_counter()
+            build_index(jobs=label_jobs, quiet=True)
+            elapsed = time.perf_counter() - start_time
+            timings.append(elapsed)
+            print(f"  {label:<8} jobs={label_jobs:<3} {elapsed:7.2f} s  ({file_count / elapsed:,.0f} files/s)")
+    finally:
+        os.chdir(original_cwd)
+
+    print(f"  speedup: {timings[0] / timings[1]:.2f}x")
 
 def main():
-    build_index()
+    parser = argparse.ArgumentParser(description='Build the requirements index (./tmp/reqs.sqlite)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Update the existing index, re-parsing only changed, added or removed files')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for parsing files (default: CPU count, 1 disables the pool)')
+    parser.add_argument('--config', default=None, metavar='PATH',
+                        help='Scan configuration file (default: ./req-index.json if present)')
+    parser.add_argument('--benchmark', type=int, nargs='?', const=50000, metavar='FILES',
+                        help='Compare serial and parallel full builds on a synthetic tree (default: 50000 files)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.jobs)
+        return
+
+    try:
+        build_index(incremental=args.incremental, jobs=args.jobs, config_path=args.config)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -6,6 +6,7 @@
 
 import sys
 import shutil
+import argparse
 from pathlib import Path
 
 # Fix Windows console encoding for Unicode characters
@@ -13,17 +14,34 @@ if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
-def cleanup():
+# Agent response cache (see prompt_agentic_coder.py), kept with --keep-agent-cache
+AGENT_CACHE_DIR = './tmp/agent-cache'
+
+def cleanup(keep_agent_cache=False):
     """Delete reports and tmp directories."""
     dirs_to_delete = ['./reports', './tmp']
 
     for dir_path in dirs_to_delete:
         path = Path(dir_path)
         if path.exists() and path.is_dir():
+            if keep_agent_cache and dir_path == './tmp' and Path(AGENT_CACHE_DIR).is_dir():
+                for child in path.iterdir():
+                    if child == Path(AGENT_CACHE_DIR):
+                        continue
+                    if child.is_dir() and not child.is_symlink():
+                        shutil.rmtree(child)
+                    else:
+                        child.unlink()
+                print(f"Deleted: {dir_path} (kept {AGENT_CACHE_DIR})")
+                continue
             shutil.rmtree(path)
             print(f"Deleted: {dir_path}")
         else:
             print(f"Skipped (not found): {dir_path}")
 
 if __name__ == '__main__':
-    cleanup()
+    parser = argparse.ArgumentParser(description='Delete ./reports and ./tmp')
+    parser.add_argument('--keep-agent-cache', action='store_true',
+                        help=f'Keep the agent response cache in {AGENT_CACHE_DIR}')
+    args = parser.parse_args()
+    cleanup(keep_agent_cache=args.keep_agent_cache)
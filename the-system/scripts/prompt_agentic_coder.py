@@ -15,16 +15,47 @@ Usage:
 Or from Python:
     import prompt_agentic_coder
     result = prompt_agentic_coder.get_ai_response_text(prompt_text, report_type="my_task")
+
+Or, to run many prompts concurrently without a thread per call:
+    results = await prompt_agentic_coder.get_ai_response_text_async(prompt_text, report_type="my_task")
+
+Streaming mode (stream=True, an on_progress callback, or
+PROMPT_AGENTIC_STREAM=1) reads the agent's JSON events as they arrive,
+reports progress, and spools the raw stream and stderr to files next to the
+report as it goes instead of holding the whole output in memory until the
+agent exits; only the last STREAM_KEEP_CHARS of non-event output and stderr
+are kept for the response text. The finished report has the same layout as
+a non-streaming one.
+
+Agent launches go through a token-bucket rate limiter shared by every call
+in the process (PROMPT_AGENTIC_RATE_PER_MIN launches per minute, bursts of
+PROMPT_AGENTIC_RATE_BURST; unlimited by default). Set
+PROMPT_AGENTIC_RATE_FILE to a state file (e.g. ./tmp/agent-rate.json) to
+share the budget between processes. Runs that fail with a rate-limit error
+(judged from stderr and the CLI's structured error fields, never from the
+answer text) are retried up to PROMPT_AGENTIC_MAX_RETRIES times (default 3),
+backing off from PROMPT_AGENTIC_BACKOFF seconds (default 30); the backoff
+also pauses every other launch sharing the limiter.
 """
 
 import os
 import sys
+import re
 import json
+import hashlib
 import subprocess
+import asyncio
 import argparse
+import random
 import threading
+import time
+import shutil
+import weakref
+import codecs
+import collections
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 # Fix Windows console encoding for Unicode characters
 if sys.stdout.encoding != 'utf-8':
@@ -33,6 +64,82 @@ if sys.stdout.encoding != 'utf-8':
 
 SUPPORTED_AGENTS = {"codex", "claude"}
 
+# Opt-in response cache (PROMPT_AGENTIC_CACHE=1), least recently used entries evicted first
+CACHE_DIR = Path("./tmp/agent-cache")
+CACHE_VERSION = 1
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Async calls: agents running at once per event loop (PROMPT_AGENTIC_MAX_CONCURRENCY)
+DEFAULT_MAX_CONCURRENCY = 8
+_semaphores = weakref.WeakKeyDictionary()
+# Longest stdout line the async reader accepts (one JSON event)
+STREAM_LINE_LIMIT = 64 * 1024 * 1024
+# Streaming: characters of non-event output and of stderr kept for the response (the report keeps all)
+STREAM_KEEP_CHARS = 64 * 1024
+
+# Rate limiting and retries (see module docstring)
+DEFAULT_RATE_BURST = 1
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 30.0
+MAX_BACKOFF = 600.0
+# Agent errors (stderr, error events) that mean the provider refused the request for rate/quota reasons
+RATE_LIMIT_PATTERN = re.compile(
+    r'rate[ _-]?limit|too many requests|\b429\b|overloaded|usage limit|quota exceeded',
+    re.IGNORECASE
+)
+
+# @path/to/file references in prompts
+AT_FILE_PATTERN = re.compile(r'@([A-Za-z0-9_./\\-]+)')
+
+
+class RateLimitError(RuntimeError):
+    """The agent CLI failed because the provider is rate limiting us."""
+
+
+def _env_number(name, default, cast=int):
+    """Numeric setting from the environment; default if unset or malformed."""
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _event_error(agent, event):
+    """The error a structured agent event reports, or None (answer text is never an error)."""
+    if agent == "codex":
+        if event.get("type") == "error":
+            return str(event.get("message", ""))
+        if event.get("type") == "turn.failed":
+            error = event.get("error")
+            return str(error.get("message", "") if isinstance(error, dict) else error or "")
+        return None
+    if event.get("type") == "result" and event.get("is_error"):
+        # The result is the error message here, not an answer
+        return " ".join(str(part) for part in (event.get("api_error_status"), event.get("subtype"),
+                                               event.get("result")) if part)
+    return None
+
+
+def _output_errors(agent, raw_stdout):
+    """Errors reported by the structured events in a finished run's stdout."""
+    stripped = raw_stdout.strip()
+    try:
+        events = [json.loads(stripped)]
+    except json.JSONDecodeError:
+        events = []
+        for line in stripped.splitlines():
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    errors = []
+    for event in events:
+        if isinstance(event, dict):
+            error = _event_error(agent, event)
+            if error is not None:
+                errors.append(error)
+    return errors
+
 
 def _process_codex_output(raw_stdout):
     final_agent_message = None
@@ -74,44 +181,17 @@ def _process_claude_output(raw_stdout):
     return result_text
 
 
-def get_ai_response_text(prompt_text: str, report_type: str = "prompt", timeout: int = 3600, agent: str = DEFAULT_AGENT) -> str:
-    """
-    Run a prompt by delegating to the configured agent CLI using JSON output.
-
-    Args:
-        prompt_text: The prompt to send to the agent
-        report_type: Type of report for filename (e.g., "failing_test", "write_reqs")
-        timeout: Maximum seconds to wait for the agent (default: 3600 = 1 hour)
-        agent: Name of the agent CLI to use ("claude" or "codex")
-
-    Returns:
-        str: The AI's response text (NOT a subprocess.CompletedProcess object)
-    """
-    if agent not in SUPPORTED_AGENTS:
-        raise ValueError(f"Unsupported agent '{agent}'. Supported agents: {', '.join(sorted(SUPPORTED_AGENTS))}")
-
-    # Create ./tmp directory if needed
-    tmp_dir = Path("./tmp")
-    tmp_dir.mkdir(exist_ok=True)
-
-    # Generate timestamp for unique filename
-    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S-%f")
-    prompt_file = tmp_dir / f"{timestamp}_prompt.md"
-
-    print(f"DEBUG [prompt_agentic_coder]: Writing prompt to {prompt_file}", file=sys.stderr, flush=True)
-
-    # Write prompt to file
-    prompt_file.write_text(prompt_text, encoding='utf-8')
-
-    # Build agent CLI command
+def _build_agent_cmd(agent, stream=False):
+    """Command line for the agent CLI; stream selects line-delimited JSON events."""
+    model_override = os.environ.get("PROMPT_AGENTIC_MODEL")
     if agent == "codex":
+        # codex --json already emits one event per line
         agent_cmd = [
             "codex", "exec", "-",
             "--json",
             "--skip-git-repo-check",
             "--dangerously-bypass-approvals-and-sandbox"
         ]
-        model_override = os.environ.get("PROMPT_AGENTIC_MODEL")
         if model_override:
             agent_cmd.extend(["--model", model_override])
     else:  # agent == "claude"
@@ -120,64 +200,193 @@ def get_ai_response_text(prompt_text: str, report_type: str = "prompt", timeout:
         agent_cmd = [
             claude_cmd,
             "-",
-            "--output-format=json",
+            "--output-format=stream-json" if stream else "--output-format=json",
             "--dangerously-skip-permissions"
         ]
-        model_override = os.environ.get("PROMPT_AGENTIC_MODEL")
+        if stream:
+            agent_cmd.append("--verbose")  # Required by claude for stream-json
         agent_cmd.extend(["--model", model_override if model_override else "sonnet"])
+    return agent_cmd
+
+
+def describe_event(event):
+    """One-line summary of a codex or claude stream event, or None if not worth showing."""
+    event_type = event.get("type")
+    if event_type in ("item.started", "item.completed"):  # codex
+        item = event.get("item", {})
+        item_type = item.get("type", "item")
+        if item_type == "command_execution":
+            return f"{'running' if event_type == 'item.started' else 'ran'}: {item.get('command', '')}"
+        if event_type == "item.completed":
+            text = item.get("text") or ""
+            return f"{item_type}: {text.splitlines()[0] if text else ''}".rstrip()
+        return None
+    if event_type == "assistant":  # claude
+        for block in event.get("message", {}).get("content", []):
+            if block.get("type") == "tool_use":
+                return f"tool: {block.get('name', '')}"
+            if block.get("type") == "text" and block.get("text"):
+                return f"assistant: {block['text'].splitlines()[0]}"
+        return None
+    if event_type in ("turn.completed", "result"):
+        return "finished"
+    return None
+
+
+class _TailBuffer:
+    """The last limit characters of text appended piecewise, noting how much was dropped."""
+
+    def __init__(self, limit=STREAM_KEEP_CHARS):
+        self.limit = limit
+        self.chunks = collections.deque()
+        self.size = 0
+        self.dropped = 0
+
+    def append(self, text):
+        self.chunks.append(text)
+        self.size += len(text)
+        while self.size > self.limit and len(self.chunks) > 1:
+            chunk = self.chunks.popleft()
+            self.size -= len(chunk)
+            self.dropped += len(chunk)
+        if self.size > self.limit:
+            chunk = self.chunks.pop()
+            self.chunks.append(chunk[-self.limit:])
+            self.dropped += self.size - self.limit
+            self.size = self.limit
+
+    def text(self, separator=""):
+        text = separator.join(self.chunks)
+        if self.dropped:
+            return f"[... {self.dropped} earlier chars truncated ...]\n{text}"
+        return text
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+
+class _StreamParser:
+    """
+    Parse an agent's JSON event stream one line at a time, keeping only what
+    the final message needs: the last agent message (codex) or the result
+    event (claude), plus the last non-JSON lines as a fallback.
+    """
 
-    print(f"DEBUG [prompt_agentic_coder]: Launching {agent} CLI (timeout: {timeout}s)...", file=sys.stderr, flush=True)
+    def __init__(self, agent):
+        self.agent = agent
+        self.final_message = None
+        self.other_lines = _TailBuffer()
+        self.last_event_line = None
+        self.errors = []
 
-    # Launch agent CLI and capture output
-    try:
-        # Internal subprocess result - NOT what this function returns!
-        _subprocess_result = subprocess.run(
-            agent_cmd,
-            input=prompt_text,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=timeout
-        )
+    def feed(self, line):
+        """Parse one line; returns the event dict, or None for blank or non-JSON lines."""
+        stripped = line.strip()
+        if not stripped:
+            return None
+        try:
+            event = json.loads(stripped)
+        except json.JSONDecodeError:
+            self.other_lines.append(stripped)
+            return None
+        if not isinstance(event, dict):
+            return None
+
+        self.last_event_line = stripped
+        error = _event_error(self.agent, event)
+        if error is not None:
+            self.errors.append(error)
+        if self.agent == "codex":
+            if event.get("type") == "item.completed":
+                item = event.get("item", {})
+                if item.get("type") == "agent_message":
+                    self.final_message = item.get("text", "")
+        elif event.get("type") == "result":
+            self.final_message = event.get("result")
+        return event
+
+    def result(self):
+        """The final message, like _process_codex_output / _process_claude_output."""
+        if self.final_message is not None:
+            return self.final_message
+        if self.other_lines:
+            return self.other_lines.text("\n")
+        return self.last_event_line or ""
+
+
+def _print_progress(event):
+    """Default on_progress: one DEBUG line per interesting event."""
+    summary = describe_event(event)
+    if summary:
+        print(f"DEBUG [prompt_agentic_coder]: {summary[:200]}", file=sys.stderr, flush=True)
+
+
+def _forward_event(parser, line, on_progress):
+    """Parse one output line and pass its event, if any, to on_progress."""
+    event = parser.feed(line)
+    if event is not None and on_progress is not None:
+        try:
+            on_progress(event)
+        except Exception as e:
+            print(f"DEBUG [prompt_agentic_coder]: on_progress failed: {e}", file=sys.stderr, flush=True)
 
-        raw_stdout = _subprocess_result.stdout or ""
-        raw_stderr = _subprocess_result.stderr or ""
 
-        final_agent_message = None
+def _write_prompt_file(prompt_text):
+    """Keep a copy of the prompt in ./tmp/ for debugging."""
+    # Create ./tmp directory if needed
+    tmp_dir = Path("./tmp")
+    tmp_dir.mkdir(exist_ok=True)
 
-        if agent == "codex":
-            final_agent_message = _process_codex_output(raw_stdout)
-        else:
-            final_agent_message = _process_claude_output(raw_stdout)
+    # Generate timestamp for unique filename
+    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S-%f")
+    prompt_file = tmp_dir / f"{timestamp}_prompt.md"
 
-        ai_response = final_agent_message or ""
+    print(f"DEBUG [prompt_agentic_coder]: Writing prompt to {prompt_file}", file=sys.stderr, flush=True)
 
-        if raw_stderr:
-            ai_response += f"\n\n--- stderr ---\n{raw_stderr}"
+    # Write prompt to file
+    prompt_file.write_text(prompt_text, encoding='utf-8')
 
-        print(f"DEBUG [prompt_agentic_coder]: {agent} CLI completed (exit code: {_subprocess_result.returncode})", file=sys.stderr, flush=True)
-        print(f"DEBUG [prompt_agentic_coder]: Final message length: {len(ai_response)} chars", file=sys.stderr, flush=True)
 
-        # Write structured report to ./reports/
-        reports_dir = Path("./reports")
-        reports_dir.mkdir(exist_ok=True)
+def _combine_output(agent, raw_stdout, raw_stderr):
+    """The response text: the agent's final message, followed by any stderr."""
+    if agent == "codex":
+        final_agent_message = _process_codex_output(raw_stdout)
+    else:
+        final_agent_message = _process_claude_output(raw_stdout)
 
-        report_timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-        final_report_path = reports_dir / f"{report_timestamp}_{report_type}.md"
+    return _with_stderr(final_agent_message or "", raw_stderr)
 
-        # Format report with prompt and response
-        report_title = report_type.replace('_', ' ').title()
 
-        # Pretty-format the JSON output
-        try:
-            parsed_json = json.loads(raw_stdout)
-            pretty_json = json.dumps(parsed_json, indent=1)
-        except (json.JSONDecodeError, ValueError):
-            # If it's not valid JSON, just use the raw output
-            pretty_json = raw_stdout
+def _with_stderr(message, raw_stderr):
+    """The response text: message, then stderr if there is any."""
+    if raw_stderr:
+        return f"{message}\n\n--- stderr ---\n{raw_stderr}"
+    return message
+
+
+def _report_path(report_type):
+    reports_dir = Path("./reports")
+    reports_dir.mkdir(exist_ok=True)
+    report_timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    return reports_dir / f"{report_timestamp}_{report_type}.md", report_timestamp
+
+
+def _write_report(prompt_text, report_type, ai_response, raw_stdout):
+    """Write the structured report for a completed (non-streaming) run to ./reports/."""
+    final_report_path, report_timestamp = _report_path(report_type)
+
+    # Format report with prompt and response
+    report_title = report_type.replace('_', ' ').title()
+
+    # Pretty-format the JSON output
+    try:
+        parsed_json = json.loads(raw_stdout)
+        pretty_json = json.dumps(parsed_json, indent=1)
+    except (json.JSONDecodeError, ValueError):
+        # If it's not valid JSON, just use the raw output
+        pretty_json = raw_stdout
 
-        structured_report = f"""# {report_title}
+    structured_report = f"""# {report_title}
 **Timestamp:** {report_timestamp}
 
 ---
@@ -203,11 +412,194 @@ def get_ai_response_text(prompt_text: str, report_type: str = "prompt", timeout:
 ```
 """
 
-        final_report_path.write_text(structured_report, encoding='utf-8')
-        print(f"DEBUG [prompt_agentic_coder]: Wrote report to {final_report_path}", file=sys.stderr, flush=True)
+    final_report_path.write_text(structured_report, encoding='utf-8')
+    print(f"DEBUG [prompt_agentic_coder]: Wrote report to {final_report_path}", file=sys.stderr, flush=True)
 
-        if _subprocess_result.returncode != 0:
-            raise RuntimeError(f"{agent} CLI exited with {_subprocess_result.returncode}")
+
+class _StreamReport:
+    """
+    The report of a streaming run, laid out like _write_report's. Raw output
+    and stderr are spooled to files next to it while the agent runs, so
+    neither is held in memory; close() assembles the report.
+    """
+
+    def __init__(self, prompt_text, report_type):
+        self.prompt_text = prompt_text
+        self.path, self.timestamp = _report_path(report_type)
+        self.title = report_type.replace('_', ' ').title()
+        self.raw_path = self.path.with_name(f"{self.path.stem}.raw.partial")
+        self.stderr_path = self.path.with_name(f"{self.path.stem}.stderr.partial")
+        self.raw = open(self.raw_path, 'w', encoding='utf-8')
+        self.stderr = open(self.stderr_path, 'w', encoding='utf-8')
+        self.raw_ends_line = True
+        print(f"DEBUG [prompt_agentic_coder]: Streaming raw output to {self.raw_path}", file=sys.stderr, flush=True)
+
+    def write_raw(self, line):
+        self.raw.write(line)
+        self.raw.flush()
+        self.raw_ends_line = line.endswith('\n')
+
+    def write_stderr(self, text):
+        self.stderr.write(text)
+        self.stderr.flush()
+
+    def close(self, message):
+        """Write the report with the agent's final message, then remove the spool files."""
+        self.raw.close()
+        self.stderr.close()
+        with open(self.path, 'w', encoding='utf-8') as report:
+            report.write(f"""# {self.title}
+**Timestamp:** {self.timestamp}
+
+---
+
+## Prompt
+
+{self.prompt_text}
+
+---
+
+## Response
+
+{message}""")
+            if os.path.getsize(self.stderr_path):
+                report.write("\n\n--- stderr ---\n")
+                with open(self.stderr_path, 'r', encoding='utf-8') as spool:
+                    shutil.copyfileobj(spool, report)
+            report.write("""
+
+---
+
+## Raw JSON Output
+
+```json
+// FULL JSON FROM AI
+""")
+            with open(self.raw_path, 'r', encoding='utf-8') as spool:
+                shutil.copyfileobj(spool, report)
+            if not self.raw_ends_line:
+                report.write("\n")
+            report.write("""// FULL JSON FROM AI END
+```
+""")
+        os.remove(self.raw_path)
+        os.remove(self.stderr_path)
+        print(f"DEBUG [prompt_agentic_coder]: Wrote report to {self.path}", file=sys.stderr, flush=True)
+
+
+def _finish_run(agent, returncode, ai_response, raw_stderr, errors):
+    """
+    Log the outcome and raise if the agent failed. Only stderr and the errors
+    from structured events decide whether it was rate limited: the answer
+    text may well mention rate limits itself.
+    """
+    print(f"DEBUG [prompt_agentic_coder]: {agent} CLI completed (exit code: {returncode})", file=sys.stderr, flush=True)
+    print(f"DEBUG [prompt_agentic_coder]: Final message length: {len(ai_response)} chars", file=sys.stderr, flush=True)
+
+    if returncode != 0:
+        if any(RATE_LIMIT_PATTERN.search(text) for text in [raw_stderr] + errors):
+            raise RateLimitError(f"{agent} CLI exited with {returncode} (rate limited)")
+        raise RuntimeError(f"{agent} CLI exited with {returncode}")
+
+
+def _run_streaming(agent, agent_cmd, prompt_text, report_type, timeout, on_progress):
+    """Run the agent CLI with Popen, parsing events as they arrive."""
+    process = subprocess.Popen(
+        agent_cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1
+    )
+
+    def feed_stdin():
+        try:
+            process.stdin.write(prompt_text)
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass  # The agent exited early; its exit code says why
+
+    report = _StreamReport(prompt_text, report_type)
+    stderr_tail = _TailBuffer()
+
+    def drain_stderr():
+        for chunk in process.stderr:
+            report.write_stderr(chunk)
+            stderr_tail.append(chunk)
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        process.kill()
+
+    threads = [threading.Thread(target=feed_stdin, daemon=True), threading.Thread(target=drain_stderr, daemon=True)]
+    for thread in threads:
+        thread.start()
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.start()
+
+    parser = _StreamParser(agent)
+    try:
+        for line in process.stdout:
+            report.write_raw(line)
+            _forward_event(parser, line, on_progress)
+
+        returncode = process.wait()
+        for thread in threads:
+            thread.join()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        for thread in threads:
+            thread.join()
+        report.close(parser.result() or "")
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(agent_cmd, timeout)
+
+    raw_stderr = stderr_tail.text()
+    ai_response = _with_stderr(parser.result() or "", raw_stderr)
+    _finish_run(agent, returncode, ai_response, raw_stderr, parser.errors)
+    return ai_response
+
+
+def _run_agent(prompt_text, report_type, timeout, agent, stream, on_progress):
+    """Run the agent CLI once and write its report; see get_ai_response_text."""
+    _write_prompt_file(prompt_text)
+
+    # Build agent CLI command
+    agent_cmd = _build_agent_cmd(agent, stream)
+
+    print(f"DEBUG [prompt_agentic_coder]: Launching {agent} CLI (timeout: {timeout}s)...", file=sys.stderr, flush=True)
+
+    # Launch agent CLI and capture output
+    try:
+        if stream:
+            return _run_streaming(agent, agent_cmd, prompt_text, report_type, timeout, on_progress or _print_progress)
+
+        # Internal subprocess result - NOT what this function returns!
+        _subprocess_result = subprocess.run(
+            agent_cmd,
+            input=prompt_text,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout
+        )
+
+        raw_stdout = _subprocess_result.stdout or ""
+        raw_stderr = _subprocess_result.stderr or ""
+        ai_response = _combine_output(agent, raw_stdout, raw_stderr)
+
+        _write_report(prompt_text, report_type, ai_response, raw_stdout)
+        _finish_run(agent, _subprocess_result.returncode, ai_response, raw_stderr, _output_errors(agent, raw_stdout))
 
         return ai_response  # Returns str, not subprocess result!
 
@@ -220,11 +612,513 @@ def get_ai_response_text(prompt_text: str, report_type: str = "prompt", timeout:
         print(f"ERROR [prompt_agentic_coder]: {error_msg}", file=sys.stderr, flush=True)
         raise
 
-def test_worker(task_name, prompt, expected_answer, results, agent):
-    """Worker thread for test mode"""
+
+def _get_semaphore():
+    """The limiter shared by every async call on the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        limit = _env_number("PROMPT_AGENTIC_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(max(1, limit))
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def _communicate_streaming(process, parser, prompt_text, report, on_progress):
+    """
+    Feed the prompt, parse stdout lines as they arrive and spool stderr to
+    the report. Returns (exit code, the tail of stderr).
+    """
+    async def feed_stdin():
+        try:
+            process.stdin.write(prompt_text.encode('utf-8'))
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass  # The agent exited early; its exit code says why
+
+    stderr_tail = _TailBuffer()
+
+    async def drain_stderr():
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            chunk = await process.stderr.read(64 * 1024)
+            text = decoder.decode(chunk, final=not chunk).replace('\r\n', '\n')
+            if text:
+                report.write_stderr(text)
+                stderr_tail.append(text)
+            if not chunk:
+                break
+
+    stdin_task = asyncio.ensure_future(feed_stdin())
+    stderr_task = asyncio.ensure_future(drain_stderr())
+    try:
+        async for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='replace').replace('\r\n', '\n')
+            report.write_raw(line)
+            _forward_event(parser, line, on_progress)
+
+        returncode = await process.wait()
+        await stdin_task
+        await stderr_task
+    finally:
+        stdin_task.cancel()
+        stderr_task.cancel()
+
+    return returncode, stderr_tail.text()
+
+
+async def _run_agent_async(prompt_text, report_type, timeout, agent, stream, on_progress):
+    """Async twin of _run_agent, on an asyncio subprocess."""
+    _write_prompt_file(prompt_text)
+
+    agent_cmd = _build_agent_cmd(agent, stream)
+
+    print(f"DEBUG [prompt_agentic_coder]: Launching {agent} CLI (timeout: {timeout}s)...", file=sys.stderr, flush=True)
+
+    process = None
+    report = None
+    parser = _StreamParser(agent)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *agent_cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT
+        )
+
+        if stream:
+            report = _StreamReport(prompt_text, report_type)
+            returncode, raw_stderr = await asyncio.wait_for(
+                _communicate_streaming(process, parser, prompt_text, report, on_progress or _print_progress),
+                timeout
+            )
+            ai_response = _with_stderr(parser.result() or "", raw_stderr)
+            errors = parser.errors
+        else:
+            stdout, stderr = await asyncio.wait_for(process.communicate(prompt_text.encode('utf-8')), timeout)
+            raw_stdout = stdout.decode('utf-8', errors='replace').replace('\r\n', '\n')
+            raw_stderr = stderr.decode('utf-8', errors='replace')
+            ai_response = _combine_output(agent, raw_stdout, raw_stderr)
+            errors = _output_errors(agent, raw_stdout)
+            returncode = process.returncode
+            _write_report(prompt_text, report_type, ai_response, raw_stdout)
+
+        _finish_run(agent, returncode, ai_response, raw_stderr, errors)
+        return ai_response
+
+    except asyncio.TimeoutError:
+        error_msg = f"Timeout: {agent} CLI did not complete within {timeout}s"
+        print(f"ERROR [prompt_agentic_coder]: {error_msg}", file=sys.stderr, flush=True)
+        raise TimeoutError(error_msg)
+    except asyncio.CancelledError:
+        print(f"DEBUG [prompt_agentic_coder]: {agent} CLI cancelled", file=sys.stderr, flush=True)
+        raise
+    except Exception as e:
+        error_msg = f"Error running {agent} CLI: {e}"
+        print(f"ERROR [prompt_agentic_coder]: {error_msg}", file=sys.stderr, flush=True)
+        raise
+    finally:
+        # Timeouts and cancellation must not leave the agent running
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        if report is not None:
+            report.close(parser.result() or "")
+
+
+def _referenced_files(prompt_text):
+    """Existing files named by @path references, following references inside .md files."""
+    found = set()
+    pending = [prompt_text]
+    while pending:
+        text = pending.pop()
+        for match in AT_FILE_PATTERN.finditer(text):
+            # Trailing punctuation ("@file.md:", "@file.md.") is not part of the path
+            path = match.group(1).replace("\\", "/").rstrip(".:")
+            if path in found or not os.path.isfile(path):
+                continue
+            found.add(path)
+            if path.endswith(".md"):
+                pending.append(Path(path).read_text(encoding='utf-8', errors='replace'))
+    return sorted(found)
+
+
+def _hash_inputs(paths):
+    """sha256 over the given files and directories (recursively), in a stable order."""
+    hasher = hashlib.sha256()
+    for path in sorted(set(paths)):
+        if os.path.isdir(path):
+            files = sorted(str(p) for p in Path(path).rglob("*") if p.is_file())
+        else:
+            files = [path]
+        for filespec in files:
+            hasher.update(filespec.replace("\\", "/").encode('utf-8') + b"\0")
+            try:
+                with open(filespec, 'rb') as f:
+                    hasher.update(hashlib.sha256(f.read()).digest())
+            except OSError:
+                hasher.update(b"missing")
+    return hasher.hexdigest()
+
+
+def _cache_key(prompt_text, agent, inputs_hash):
+    default_model = "sonnet" if agent == "claude" else ""
+    model = os.environ.get("PROMPT_AGENTIC_MODEL") or default_model
+    payload = json.dumps([CACHE_VERSION, agent, model, prompt_text, inputs_hash])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_get(key):
+    """Cached response for key, or None. A hit marks the entry as recently used."""
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            response = json.load(f)["response"]
+        os.utime(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return response
+
+
+def _cache_put(key, response):
+    """Store a response, then evict least recently used entries over the size limit."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{key}.json"
+    temp_path = CACHE_DIR / f"{key}.json.tmp-{os.getpid()}-{threading.get_ident()}"
+    temp_path.write_text(json.dumps({"response": response}), encoding='utf-8')
+    os.replace(temp_path, path)
+
+    max_bytes = _env_number("PROMPT_AGENTIC_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES)
+    entries = []
+    for entry in CACHE_DIR.glob("*.json"):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # Evicted by another process
+        entries.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for mtime, size, entry in entries)
+    for mtime, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+        total -= size
+
+
+def _write_cached_report(prompt_text, report_type, ai_response, key):
+    report_path, report_timestamp = _report_path(report_type)
+    report_title = report_type.replace('_', ' ').title()
+    report_path.write_text(f"""# {report_title}
+**Timestamp:** {report_timestamp}
+**Replayed from response cache:** {key}
+
+---
+
+## Prompt
+
+{prompt_text}
+
+---
+
+## Response
+
+{ai_response}
+""", encoding='utf-8')
+    return report_path
+
+
+class _FileLock:
+    """Exclusive lock on a file, held for the duration of a with block (works across processes)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'a+')
+        if sys.platform == "win32":
+            import msvcrt
+            self.file.seek(0)
+            # LK_LOCK gives up after about 10 seconds; keep waiting while another process holds it
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if sys.platform == "win32":
+            import msvcrt
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+
+
+class _RateLimiter:
+    """
+    Token bucket for agent launches.
+
+    reserve() takes a token and returns how long to wait before launching,
+    so sync and async callers can both sleep their own way. pause() holds
+    back every launch, e.g. after the provider reported a rate limit. The
+    state lives in memory, or in state_path (guarded by a lock file) to
+    share one budget between processes.
+    """
+
+    def __init__(self, rate_per_min, burst, state_path=None):
+        self.rate = rate_per_min / 60.0
+        self.burst = max(1.0, float(burst))
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.state = {"tokens": self.burst, "updated": time.time(), "not_before": 0.0}
+
+    def _load(self):
+        if self.state_path is None:
+            return self.state
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"tokens": self.burst, "updated": time.time(), "not_before": 0.0}
+
+    def _save(self, state):
+        if self.state_path is None:
+            self.state = state
+            return
+        temp_path = f"{self.state_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def _update(self, change):
+        """Apply change(state, now) under the in-process lock and, if shared, the file lock."""
+        with self.lock:
+            if self.state_path is None:
+                return change(self.state, time.time())
+            with _FileLock(f"{self.state_path}.lock"):
+                state = self._load()
+                result = change(state, time.time())
+                self._save(state)
+                return result
+
+    def reserve(self):
+        """Take one launch token; returns the seconds to wait before using it."""
+        def take(state, now):
+            delay = max(0.0, state["not_before"] - now)
+            if self.rate > 0:
+                elapsed = max(0.0, now - state["updated"])
+                state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate) - 1
+                state["updated"] = now
+                if state["tokens"] < 0:
+                    delay = max(delay, -state["tokens"] / self.rate)
+            return delay
+        return self._update(take)
+
+    def pause(self, seconds):
+        """Hold back every launch for at least the given number of seconds."""
+        def hold(state, now):
+            state["not_before"] = max(state["not_before"], now + seconds)
+        self._update(hold)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def _get_limiter():
+    """The process-wide rate limiter, configured from the environment on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = _RateLimiter(
+                _env_number("PROMPT_AGENTIC_RATE_PER_MIN", 0.0, float),
+                _env_number("PROMPT_AGENTIC_RATE_BURST", DEFAULT_RATE_BURST, float),
+                os.environ.get("PROMPT_AGENTIC_RATE_FILE") or None
+            )
+        return _limiter
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with jitter for retry number attempt (0-based)."""
+    base = _env_number("PROMPT_AGENTIC_BACKOFF", DEFAULT_BACKOFF, float)
+    delay = min(MAX_BACKOFF, base * (2 ** attempt))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _on_rate_limited(agent, attempt, max_retries, error):
+    """
+    Decide what to do after a rate-limit failure: re-raise when out of
+    retries, else pause the shared limiter and return the backoff delay.
+    """
+    if attempt >= max_retries:
+        raise error
+    delay = _backoff_delay(attempt)
+    _get_limiter().pause(delay)
+    print(f"DEBUG [prompt_agentic_coder]: {agent} CLI rate limited; retry {attempt + 1}/{max_retries} "
+          f"in {delay:.1f}s", file=sys.stderr, flush=True)
+    return delay
+
+
+def _wait_for_launch(agent):
+    """Block until the rate limiter allows another launch."""
+    delay = _get_limiter().reserve()
+    if delay > 0:
+        print(f"DEBUG [prompt_agentic_coder]: Rate limiter: waiting {delay:.1f}s to launch {agent} CLI", file=sys.stderr, flush=True)
+        time.sleep(delay)
+
+
+async def _wait_for_launch_async(agent):
+    """Async _wait_for_launch; the limiter may wait for its file lock, so it runs in a thread."""
+    delay = await asyncio.get_running_loop().run_in_executor(None, _get_limiter().reserve)
+    if delay > 0:
+        print(f"DEBUG [prompt_agentic_coder]: Rate limiter: waiting {delay:.1f}s to launch {agent} CLI", file=sys.stderr, flush=True)
+        await asyncio.sleep(delay)
+
+
+def _cache_begin(prompt_text, report_type, agent, cache, cache_inputs):
+    """
+    Look the prompt up in the response cache. Returns (entry, cached response);
+    entry is None when caching is off, else what _cache_end needs.
+    """
+    if cache is None:
+        cache = os.environ.get("PROMPT_AGENTIC_CACHE") == "1"
+    if not cache or cache_inputs is None:
+        return None, None
+
+    inputs = _referenced_files(prompt_text) + [str(p) for p in cache_inputs]
+    inputs_hash = _hash_inputs(inputs)
+    key = _cache_key(prompt_text, agent, inputs_hash)
+
+    cached = _cache_get(key)
+    if cached is not None:
+        report_path = _write_cached_report(prompt_text, report_type, cached, key)
+        print(f"DEBUG [prompt_agentic_coder]: Replayed response from cache ({key[:12]}), report {report_path}", file=sys.stderr, flush=True)
+    return (inputs, inputs_hash, key), cached
+
+
+def _cache_end(entry, ai_response):
+    """Store a fresh response, unless the run changed its inputs."""
+    if entry is None:
+        return
+    inputs, inputs_hash, key = entry
+    if _hash_inputs(inputs) == inputs_hash:
+        _cache_put(key, ai_response)
+    else:
+        print("DEBUG [prompt_agentic_coder]: Inputs changed during the run; response not cached", file=sys.stderr, flush=True)
+
+
+def get_ai_response_text(prompt_text: str, report_type: str = "prompt", timeout: int = 3600, agent: str = DEFAULT_AGENT,
+                         stream: Optional[bool] = None, on_progress=None,
+                         cache: Optional[bool] = None, cache_inputs=None) -> str:
+    """
+    Run a prompt by delegating to the configured agent CLI using JSON output.
+
+    Args:
+        prompt_text: The prompt to send to the agent
+        report_type: Type of report for filename (e.g., "failing_test", "write_reqs")
+        timeout: Maximum seconds to wait for the agent (default: 3600 = 1 hour)
+        agent: Name of the agent CLI to use ("claude" or "codex")
+        stream: Parse the agent's output as it arrives (default: on if on_progress
+            is given or PROMPT_AGENTIC_STREAM=1)
+        on_progress: Called with each JSON event in streaming mode (default: print
+            a DEBUG line per tool call / message, see describe_event)
+        cache: Replay responses from ./tmp/agent-cache (default: PROMPT_AGENTIC_CACHE=1).
+            Only used when cache_inputs is given.
+        cache_inputs: Files and directories the prompt reads besides its @file
+            references (use [] if there are none). The response is cached under
+            the prompt, agent, model and the hash of all inputs, and only if the
+            run left those inputs unchanged, since replaying skips any edits.
+
+    Returns:
+        str: The AI's response text (NOT a subprocess.CompletedProcess object)
+
+    Raises:
+        RateLimitError: Still rate limited after PROMPT_AGENTIC_MAX_RETRIES retries
+        TimeoutError: The agent did not finish within timeout
+    """
+    if agent not in SUPPORTED_AGENTS:
+        raise ValueError(f"Unsupported agent '{agent}'. Supported agents: {', '.join(sorted(SUPPORTED_AGENTS))}")
+
+    if stream is None:
+        stream = on_progress is not None or os.environ.get("PROMPT_AGENTIC_STREAM") == "1"
+
+    entry, cached = _cache_begin(prompt_text, report_type, agent, cache, cache_inputs)
+    if cached is not None:
+        return cached
+
+    max_retries = _env_number("PROMPT_AGENTIC_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+    attempt = 0
+    while True:
+        _wait_for_launch(agent)
+        try:
+            ai_response = _run_agent(prompt_text, report_type, timeout, agent, stream, on_progress)
+            break
+        except RateLimitError as e:
+            time.sleep(_on_rate_limited(agent, attempt, max_retries, e))
+            attempt += 1
+
+    _cache_end(entry, ai_response)
+    return ai_response
+
+
+async def get_ai_response_text_async(prompt_text: str, report_type: str = "prompt", timeout: int = 3600,
+                                     agent: str = DEFAULT_AGENT, stream: Optional[bool] = None, on_progress=None,
+                                     cache: Optional[bool] = None, cache_inputs=None) -> str:
+    """
+    Async variant of get_ai_response_text (same arguments and result), for
+    fanning out many prompts from one thread:
+
+        results = await asyncio.gather(*(get_ai_response_text_async(p) for p in prompts))
+
+    At most PROMPT_AGENTIC_MAX_CONCURRENCY agents (default 8) run at once per
+    event loop; further calls wait for a free slot, and the timeout only
+    starts once the agent is launched. Cancelling the call kills its agent.
+    Launches share the rate limiter and retries of get_ai_response_text.
+    """
+    if agent not in SUPPORTED_AGENTS:
+        raise ValueError(f"Unsupported agent '{agent}'. Supported agents: {', '.join(sorted(SUPPORTED_AGENTS))}")
+
+    if stream is None:
+        stream = on_progress is not None or os.environ.get("PROMPT_AGENTIC_STREAM") == "1"
+
+    entry, cached = _cache_begin(prompt_text, report_type, agent, cache, cache_inputs)
+    if cached is not None:
+        return cached
+
+    max_retries = _env_number("PROMPT_AGENTIC_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+    attempt = 0
+    while True:
+        # The backoff sleep happens outside the semaphore, freeing the slot meanwhile
+        try:
+            async with _get_semaphore():
+                await _wait_for_launch_async(agent)
+                ai_response = await _run_agent_async(prompt_text, report_type, timeout, agent, stream, on_progress)
+            break
+        except RateLimitError as e:
+            # Pausing the limiter takes its file lock: keep that off the event loop
+            delay = await asyncio.get_running_loop().run_in_executor(
+                None, _on_rate_limited, agent, attempt, max_retries, e)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    _cache_end(entry, ai_response)
+    return ai_response
+
+async def test_worker(task_name, prompt, expected_answer, results, agent):
+    """Worker task for test mode"""
     try:
         print(f"[TEST] {task_name}: Submitting prompt...", file=sys.stderr, flush=True)
-        result = get_ai_response_text(prompt, report_type=f"test_{task_name}", agent=agent)
+        result = await get_ai_response_text_async(prompt, report_type=f"test_{task_name}", agent=agent)
 
         # Check if expected answer is in the result
         if str(expected_answer) in result:
@@ -254,21 +1148,15 @@ def run_test_mode(agent):
     print("[TEST] Starting test mode with 2 concurrent tasks...", file=sys.stderr, flush=True)
 
     results = {}
-    threads = []
-
-    # Spawn worker threads (each will launch its own agent CLI process)
-    for task_name, config in test_tasks.items():
-        thread = threading.Thread(
-            target=test_worker,
-            args=(task_name, config["prompt"], config["expected"], results, agent),
-            daemon=False
-        )
-        thread.start()
-        threads.append(thread)
 
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
+    # Run the workers concurrently on one event loop (each launches its own agent CLI process)
+    async def run_all():
+        await asyncio.gather(*(
+            test_worker(task_name, config["prompt"], config["expected"], results, agent)
+            for task_name, config in test_tasks.items()
+        ))
+
+    asyncio.run(run_all())
 
     # Check results
     all_passed = all(results.values())
@@ -284,6 +1172,7 @@ def main():
     """Main entry point - handles both test mode and normal stdin mode."""
     parser = argparse.ArgumentParser(description="Agentic coder prompt wrapper")
     parser.add_argument("--test", action="store_true", help="Run in test mode with concurrent prime number tasks")
+    parser.add_argument("--stream", action="store_true", help="Parse agent output as it arrives and show progress")
     parser.add_argument(
         "--agent",
         choices=sorted(SUPPORTED_AGENTS),
@@ -306,7 +1195,7 @@ def main():
 
     # Execute via selected agent CLI
     try:
-        result = get_ai_response_text(prompt, report_type="stdin_prompt", agent=args.agent)
+        result = get_ai_response_text(prompt, report_type="stdin_prompt", agent=args.agent, stream=args.stream or None)
         # Write output to stdout
         sys.stdout.write(result)
         sys.exit(0)
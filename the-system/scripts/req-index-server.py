@@ -0,0 +1,200 @@
+#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+
+"""
+Optional query server for the requirements index.
+
+Keeps an in-memory copy of ./tmp/reqs.sqlite and answers read-only queries
+on the Unix socket ./tmp/reqs.sock, so concurrent agents and scripts share
+one warm copy instead of each reading the file cold. The copy is reloaded
+whenever build-req-index.py publishes a new or updated database.
+
+Protocol: one JSON object per line.
+    request:  {"sql": "SELECT ...", "params": [...]}
+    response: {"rows": [[...], ...]}  or  {"error": "message"}
+    "query_error": true is added when the query itself failed; clients read
+    the database file instead on any other error.
+
+Only SELECT statements are allowed: an authorizer denies PRAGMAs and every
+write, so no client can change the copy the others read.
+
+Clients (req_index.query_index, used by reqtrace.py, reqsearch.py and
+software-construction.py) fall back to reading the database directly when
+the server is not running.
+
+Usage:
+    uv run --script ./the-system/scripts/req-index-server.py
+"""
+
+import sys
+# Fix Windows console encoding for Unicode characters
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+import os
+import json
+import socket
+import sqlite3
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+
+# Change to project root (two levels up from this script)
+script_dir = Path(__file__).parent
+project_root = script_dir.parent.parent
+os.chdir(project_root)
+
+sys.path.insert(0, str(script_dir))
+from req_index import DB_PATH, SOCKET_PATH
+
+# Authorizer actions a read-only query needs; everything else is denied
+ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+
+class QueryError(Exception):
+    """The client's query failed (as opposed to the server failing to load the database)."""
+
+
+def authorize(action, arg1, arg2, db_name, trigger):
+    """SQLite authorizer for client queries: reads only."""
+    if action in ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_OK
+    # FTS5 reads the data version on every search
+    if action == sqlite3.SQLITE_PRAGMA and arg1 == 'data_version' and arg2 is None:
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+
+class IndexSnapshot:
+    """In-memory copy of the database, reloaded when the file on disk changes."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+        self.signature = None
+        self.lock = threading.Lock()
+
+    def file_signature(self):
+        """Identify the published database file; None if it doesn't exist."""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def reload_if_changed(self):
+        """Copy the database into memory if it was replaced or updated. Call with lock held."""
+        signature = self.file_signature()
+        if signature == self.signature and self.conn is not None:
+            return
+        if signature is None:
+            raise sqlite3.OperationalError(f"Requirements database not found at {self.db_path}")
+
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            memory = sqlite3.connect(':memory:', check_same_thread=False)
+            source.backup(memory)
+        finally:
+            source.close()
+        memory.execute('PRAGMA query_only = ON')
+        # Connect the virtual tables (the FTS index) before the authorizer is
+        # installed: connecting them touches the schema, which it would deny
+        for (name,) in memory.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                      "AND sql LIKE 'CREATE VIRTUAL TABLE%'").fetchall():
+            memory.execute('SELECT * FROM "{}" LIMIT 0'.format(name.replace('"', '""'))).fetchall()
+        memory.set_authorizer(authorize)
+
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = memory
+        self.signature = signature
+        print(f"Loaded {self.db_path} into memory", flush=True)
+
+    def query(self, sql, params):
+        with self.lock:
+            self.reload_if_changed()
+            try:
+                return self.conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise QueryError(str(e)) from e
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """Answer newline-delimited JSON queries until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                rows = self.server.snapshot.query(request['sql'], request.get('params', []))
+                response = {'rows': rows}
+            except (ValueError, KeyError, TypeError) as e:
+                response = {'error': f"Bad request: {e}"}
+            except QueryError as e:
+                response = {'error': str(e), 'query_error': True}
+            except sqlite3.Error as e:
+                response = {'error': str(e)}
+            try:
+                payload = json.dumps(response, ensure_ascii=False)
+            except (TypeError, ValueError) as e:
+                # e.g. a BLOB column: the rows can't be sent as JSON
+                payload = json.dumps({'error': f"Result is not JSON-serializable: {e}"})
+            self.wfile.write(payload.encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+def server_running(socket_path):
+    """True if something is already answering on socket_path."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the requirements index from memory over a Unix socket')
+    parser.parse_args()
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("ERROR: Unix sockets are not available on this platform; "
+              "clients will read ./tmp/reqs.sqlite directly", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+    if os.path.exists(SOCKET_PATH):
+        if server_running(SOCKET_PATH):
+            print(f"ERROR: A server is already listening on {SOCKET_PATH}", file=sys.stderr)
+            sys.exit(1)
+        os.remove(SOCKET_PATH)  # Left behind by a server that didn't shut down cleanly
+
+    snapshot = IndexSnapshot(DB_PATH)
+    with snapshot.lock:
+        try:
+            snapshot.reload_if_changed()
+        except sqlite3.Error as e:
+            print(f"Warning: {e} (will load it when it appears)", file=sys.stderr)
+
+    server = socketserver.ThreadingUnixStreamServer(SOCKET_PATH, QueryHandler)
+    server.daemon_threads = True
+    server.snapshot = snapshot
+    print(f"Serving {DB_PATH} on {SOCKET_PATH} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+
+
+if __name__ == '__main__':
+    main()
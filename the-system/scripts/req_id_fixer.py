@@ -0,0 +1,337 @@
+"""
+Duplicate requirement ID fixer: renumbers $REQ_IDs defined more than once
+in ./reqs/*.md so every ID is unique, and updates the references to them in
+the files the requirements index scans (./tests, ./code, ...).
+
+All paths are relative to the current directory, which must be the project
+root. Importing this module has no side effects.
+
+From the command line:
+    uv run --script ./the-system/scripts/fix-unique-req-ids.py [--dry-run]
+
+Or from Python:
+    from req_id_fixer import fix_unique_req_ids
+    plan, references = fix_unique_req_ids(dry_run=True)
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+from collections import defaultdict
+
+from req_index import REQ_ID_PATTERN, REQ_TAG_PREFIX, collect_index_files
+
+# Parsed definitions per flow file, reused while a file is unchanged
+CACHE_PATH = './tmp/req-id-fixer-cache.json'
+CACHE_VERSION = 1
+
+def extract_req_id_parts(req_id):
+    """Extract category, number, and suffix from $REQ_CATEGORY_NNN[SUFFIX]."""
+    match = re.match(r'\$REQ_(.+?)_(\d+)([A-Za-z0-9_-]*)', req_id)
+    if match:
+        category = match.group(1)
+        number = int(match.group(2))
+        suffix = match.group(3)
+        return category, number, suffix
+    return None, None, None
+
+def make_req_id(category, number, suffix=''):
+    """Create $REQ_CATEGORY_NNN[SUFFIX] from parts."""
+    return f"$REQ_{category}_{number:03d}{suffix}"
+
+def extract_req_definitions(filepath, content):
+    """Extract (req_id, title) definitions from the content of a flow file (same as req_index.py)."""
+    definitions = []
+    try:
+        # Split into sections by ## headers
+        # Pattern: ## $REQ_ID: Title
+        sections = re.split(r'\n##\s+(\$REQ_[A-Za-z0-9_-]+):\s*([^\n]+)', content)
+
+        # sections[0] is the preamble before first req
+        # sections[1::3] are req_ids
+        # sections[2::3] are titles
+        # sections[3::3] are the content blocks
+
+        for i in range(1, len(sections), 3):
+            if i+2 >= len(sections):
+                break
+
+            req_id = sections[i].strip()
+            title = sections[i+1].strip()
+
+            definitions.append((req_id, title))
+
+    except Exception as e:
+        print(f"Warning: Could not parse {filepath}: {e}", file=sys.stderr)
+
+    return definitions
+
+def load_cache():
+    """Definitions parsed on earlier runs, keyed by file: {filespec: entry}."""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+def save_cache(cache):
+    """Write the cache atomically."""
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    temp_path = f"{CACHE_PATH}.tmp-{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(temp_path, CACHE_PATH)
+
+def read_definitions(md_files, use_cache=True):
+    """
+    Definitions of every flow file: {filepath: [(req_id, title), ...]},
+    keyed by str paths like the rest of the plan.
+
+    Files whose size and mtime (or, failing that, content hash) match the
+    cache are not parsed again.
+    """
+    cache = load_cache() if use_cache else {}
+    files = cache.get('files', {})
+    new_files = {}
+    changed = False
+    result = {}
+
+    for filepath in md_files:
+        key = str(filepath)
+        stat = os.stat(filepath)
+        entry = files.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            new_files[key] = entry
+            result[key] = [tuple(d) for d in entry['definitions']]
+            continue
+
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        if entry and entry['sha256'] == sha256:
+            definitions = [tuple(d) for d in entry['definitions']]
+        else:
+            definitions = extract_req_definitions(filepath, data.decode('utf-8', errors='replace'))
+        new_files[key] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha256,
+            'definitions': [list(d) for d in definitions],
+        }
+        result[key] = definitions
+        changed = True
+
+    if use_cache and (changed or set(new_files) != set(files)):
+        save_cache({'version': CACHE_VERSION, 'files': new_files})
+    return result
+
+# Any $REQ_ID token; matches the whole ID, so no partial matches
+REQ_ID_TOKEN = re.compile(r'\$REQ_[A-Za-z0-9_-]+')
+# A definition header: ## $REQ_ID: Title
+DEFINITION_HEADER = re.compile(r'\n##\s+(\$REQ_[A-Za-z0-9_-]+):')
+
+def plan_fixes(definitions_by_file):
+    """
+    Plan every renumbering needed to make requirement IDs unique, without
+    touching any file. definitions_by_file is read_definitions() output.
+
+    The first definition of an ID is kept. In each other file defining it,
+    the ID is renamed throughout that file (references there follow the
+    definition). A repeated definition inside one file only gets its header
+    renamed. Returns [(filepath, old_id, new_id, occurrence)], where
+    occurrence is None for a whole-file rename, or the index of the header
+    among that file's definitions of old_id.
+    """
+    # Extract all definitions with their source files
+    req_id_to_files = defaultdict(list)  # req_id -> [(filepath, occurrence), ...]
+    category_max = defaultdict(int)
+
+    for filepath, definitions in definitions_by_file.items():
+        seen = defaultdict(int)
+        for req_id, title in definitions:
+            req_id_to_files[req_id].append((filepath, seen[req_id]))
+            seen[req_id] += 1
+
+            # Track max number per category
+            category, number, suffix = extract_req_id_parts(req_id)
+            if category:
+                category_max[category] = max(category_max[category], number)
+
+    # Find duplicates (req_ids appearing in multiple files OR multiple times in same file)
+    duplicates = {req_id: files for req_id, files in req_id_to_files.items() if len(files) > 1}
+
+    plan = []
+    for req_id, occurrences in sorted(duplicates.items()):
+        category, number, suffix = extract_req_id_parts(req_id)
+        if not category:
+            print(f"Warning: Cannot parse {req_id}, skipping", file=sys.stderr)
+            continue
+
+        kept_file = occurrences[0][0]
+        for filepath, occurrence in occurrences[1:]:
+            category_max[category] += 1
+            new_id = make_req_id(category, category_max[category], suffix)
+            whole_file = filepath != kept_file and occurrence == 0
+            plan.append((filepath, req_id, new_id, None if whole_file else occurrence))
+
+    return plan
+
+def path_words(path):
+    """Lowercase path with every run of non-alphanumerics turned into '_'."""
+    return re.sub(r'[^a-z0-9]+', '_', str(path).lower()).strip('_')
+
+def plan_reference_fixes(definitions_by_file, plan, config=None):
+    """
+    Plan renames of references to renumbered IDs outside the flow files.
+
+    Only IDs renamed throughout a flow file are followed; a repeated header
+    inside one file can't be told apart from the definition it repeats. For
+    each file in the index's scan set that references such an ID, pick the
+    definition it most likely means: the flow sharing the most other
+    (unique) IDs with the file, then a path naming the flow, else the
+    definition that kept the ID. Returns plan_fixes()-style entries.
+    """
+    # old_id -> [(flow_file, new_id)], the kept definition first
+    candidates = {}
+    for filepath, old_id, new_id, occurrence in plan:
+        if occurrence is None:
+            candidates.setdefault(old_id, []).append((filepath, new_id))
+    if not candidates:
+        return []
+
+    flow_ids = {}
+    owners = defaultdict(set)
+    for filepath, definitions in definitions_by_file.items():
+        flow_ids[filepath] = {req_id for req_id, title in definitions}
+        for req_id in flow_ids[filepath]:
+            owners[req_id].add(filepath)
+    for old_id in candidates:
+        kept_file = next(f for f in definitions_by_file if old_id in flow_ids[f])
+        candidates[old_id].insert(0, (kept_file, old_id))
+
+    # Only IDs with a single owner say anything about which flow a file follows
+    unique_ids = {req_id for req_id, files in owners.items() if len(files) == 1}
+    flow_words = {filepath: path_words(Path(filepath).stem) for filepath in definitions_by_file}
+    wanted = {old_id.encode('ascii') for old_id in candidates}
+
+    reference_plan = []
+    for filespec, (category, is_flow_file) in sorted(collect_index_files(config).items()):
+        if is_flow_file:
+            continue
+        try:
+            with open(filespec, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Warning: Could not read {filespec}: {e}", file=sys.stderr)
+            continue
+        if REQ_TAG_PREFIX not in data:
+            continue
+
+        tokens = set(REQ_ID_PATTERN.findall(data))
+        if not tokens & wanted:
+            continue
+        referenced = {token.decode('ascii') for token in tokens} & unique_ids
+        file_words = path_words(filespec)
+
+        for old_id, options in sorted(candidates.items()):
+            if old_id.encode('ascii') not in tokens:
+                continue
+            # max() keeps the first of equal scores, i.e. the kept definition
+            flow_file, new_id = max(options, key=lambda option: (
+                len(referenced & flow_ids[option[0]]),
+                bool(flow_words[option[0]]) and flow_words[option[0]] in file_words,
+            ))
+            if new_id != old_id:
+                reference_plan.append((filespec, old_id, new_id, None))
+
+    return reference_plan
+
+def rewrite_file(filepath, renames):
+    """
+    Apply all renames for one file with a single read, one substitution pass
+    and an atomic write. renames is [(old_id, new_id, occurrence)] as in
+    plan_fixes().
+    """
+    # surrogateescape round-trips any bytes that aren't valid UTF-8
+    with open(filepath, 'r', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        content = f.read()
+
+    whole_file = {old_id: new_id for old_id, new_id, occurrence in renames if occurrence is None}
+    headers = {(old_id, occurrence): new_id for old_id, new_id, occurrence in renames if occurrence is not None}
+
+    # Header renames are positional: find where each targeted header's ID starts
+    by_position = {}
+    if headers:
+        seen = defaultdict(int)
+        for match in DEFINITION_HEADER.finditer('\n' + content):
+            req_id = match.group(1)
+            key = (req_id, seen[req_id])
+            seen[req_id] += 1
+            if key in headers:
+                by_position[match.start(1) - 1] = headers[key]
+
+    def replace(match):
+        new_id = by_position.get(match.start())
+        if new_id is None:
+            new_id = whole_file.get(match.group(), match.group())
+        return new_id
+
+    content = REQ_ID_TOKEN.sub(replace, content)
+
+    temp_path = f"{filepath}.tmp-{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        f.write(content)
+    os.replace(temp_path, filepath)
+
+def apply_fixes(plan):
+    """Rewrite each affected file once. Returns the number of files written."""
+    by_file = defaultdict(list)
+    for filepath, old_id, new_id, occurrence in plan:
+        by_file[filepath].append((old_id, new_id, occurrence))
+    for filepath, renames in by_file.items():
+        rewrite_file(filepath, renames)
+    return len(by_file)
+
+def fix_unique_req_ids(dry_run=False, quiet=False, use_cache=True, config=None):
+    """
+    Make requirement IDs in ./reqs/*.md unique and update their references.
+
+    Returns (plan, references): the flow file renames as
+    [(filepath, old_id, new_id, occurrence)], empty if there were no
+    duplicates, and the reference updates in other files. Files are only
+    written when the plan is not empty and dry_run is False, each at most
+    once. quiet suppresses the per-rename messages. config is the index
+    scan configuration (default: load_scan_config()).
+    """
+    reqs_dir = Path('./reqs')
+    if not reqs_dir.exists():
+        if not quiet:
+            print("No ./reqs/ directory found")
+        return [], []
+
+    definitions_by_file = read_definitions(sorted(reqs_dir.glob('*.md')), use_cache)
+    plan = plan_fixes(definitions_by_file)
+    if not plan:
+        return plan, []
+    references = plan_reference_fixes(definitions_by_file, plan, config)
+
+    if not quiet:
+        last_id = None
+        for filepath, old_id, new_id, occurrence in plan:
+            if old_id != last_id:
+                print(f"\nDuplicate found: {old_id}")
+                last_id = old_id
+            where = filepath if occurrence is None else f"{filepath} (definition #{occurrence + 1} only)"
+            print(f"  {'Would renumber' if dry_run else 'Renumbering'} in {where}: {old_id} → {new_id}")
+        if references:
+            print("\nReferences:")
+            for filespec, old_id, new_id, occurrence in references:
+                print(f"  {'Would update' if dry_run else 'Updating'} {filespec}: {old_id} → {new_id}")
+
+    if not dry_run:
+        apply_fixes(plan + references)
+    return plan, references
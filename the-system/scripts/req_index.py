@@ -0,0 +1,850 @@
+"""
+Requirements index: scans ./reqs/, ./tests/ and ./code/ for $REQ_IDs and
+maintains the traceability database at ./tmp/reqs.sqlite.
+
+All paths are relative to the current directory, which must be the project
+root. Importing this module has no side effects.
+
+From the command line:
+    uv run --script ./the-system/scripts/build-req-index.py [--incremental]
+
+Or from Python:
+    from req_index import build_index, query_index
+    build_index(incremental=True)
+    rows = query_index("SELECT req_id FROM req_coverage WHERE status = ?", ('untested',))
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import fnmatch
+import time
+import hashlib
+import socket
+import sqlite3
+import concurrent.futures
+from pathlib import Path
+
+DB_PATH = './tmp/reqs.sqlite'
+
+# Optional query server (req-index-server.py) listening on a Unix socket
+SOCKET_PATH = './tmp/reqs.sock'
+SOCKET_TIMEOUT = 10.0
+
+# Bump whenever the schema changes; a mismatch forces a full rebuild
+SCHEMA_VERSION = 4
+
+# $REQ_ID pattern (letters, digits, underscores, hyphens), matched against raw bytes
+REQ_ID_PATTERN = re.compile(rb'\$REQ_[A-Za-z0-9_-]+')
+REQ_TAG_PREFIX = b'$REQ_'
+# The same pattern for decoded definition text
+REQ_ID_TEXT_PATTERN = re.compile(r'\$REQ_[A-Za-z0-9_-]+')
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_MIN_SIZE = 64 * 1024
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 2000
+# Files handed to a worker process at a time
+CHUNK_SIZE = 500
+
+# Pragmas for a full rebuild: the file is private until it is renamed into
+# place, so a crash only loses the temp file and durability isn't needed
+BULK_BUILD_PRAGMAS = (
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+)
+
+# How long to keep retrying the final rename while readers hold the old
+# database open (Windows refuses to replace an open file)
+REPLACE_TIMEOUT = 10.0
+
+# req_coverage.status values, from worst to best
+COVERAGE_STATUSES = ('orphan', 'undefined', 'untested', 'tested', 'complete')
+
+# Optional per-project scan configuration (JSON), overriding DEFAULT_SCAN_CONFIG
+# ("exclude" patterns are added to the defaults; "!target/" re-includes one):
+# {
+#   "roots": [{"path": "./code", "category": "code", "extensions": [".rs"]}],
+#   "exclude": ["generated/", "*.min.js"],
+#   "use_gitignore": true
+# }
+SCAN_CONFIG_PATH = './req-index.json'
+
+DEFAULT_SCAN_CONFIG = {
+    # Directories scanned for $REQ_ID locations
+    'roots': [
+        {'path': './reqs', 'category': 'reqs', 'extensions': ['.md']},
+        {'path': './tests', 'category': 'tests', 'extensions': ['.py']},
+        {'path': './code', 'category': 'code',
+         'extensions': ['.py', '.cs', '.go', '.rs', '.java', '.js', '.ts', '.c', '.cpp', '.h']},
+    ],
+    # .gitignore-style patterns; matching directories are never descended into
+    'exclude': [
+        '.git/', 'target/', 'node_modules/', '__pycache__/', '.venv/', 'venv/', 'vendor/', 'obj/',
+    ],
+    # Also honor .gitignore files at the project root and inside scanned directories
+    'use_gitignore': True,
+}
+
+def extract_req_locations(filepath, category, data):
+    """
+    Extract all $REQ_ID tags from a file's raw bytes with line numbers.
+
+    data may be bytes or an mmap. The whole buffer is matched at once and line
+    numbers are only worked out for matches, by counting newlines since the
+    previous match.
+    """
+    locations = []
+    filespec = str(filepath)
+    line_num = 1
+    last_pos = 0
+    for match in REQ_ID_PATTERN.finditer(data):
+        start = match.start()
+        line_num += data[last_pos:start].count(b'\n')
+        last_pos = start
+        locations.append((match.group().decode('ascii'), filespec, line_num, category))
+    return locations
+
+def extract_req_definitions(filepath, content):
+    """Extract requirement definitions from the content of a flow file in ./reqs/."""
+    definitions = []
+    try:
+        # Split into sections by ## headers
+        # Pattern: ## $REQ_ID: Title
+        sections = re.split(r'\n##\s+(\$REQ_[A-Za-z0-9_-]+):\s*([^\n]+)', content)
+
+        # sections[0] is the preamble before first req
+        # sections[1::3] are req_ids
+        # sections[2::3] are titles
+        # sections[3::3] are the content blocks
+
+        for i in range(1, len(sections), 3):
+            if i+2 >= len(sections):
+                break
+
+            req_id = sections[i].strip()
+            title = sections[i+1].strip()
+            content_block = sections[i+2].strip()
+
+            # Extract source attribution from content
+            source_match = re.search(r'\*\*Source:\*\*\s*([^\n]+)', content_block)
+            source_attribution = source_match.group(1).strip() if source_match else ''
+
+            # Extract requirement text (everything after source line)
+            if source_match:
+                req_text = content_block[source_match.end():].strip()
+            else:
+                req_text = content_block
+
+            definitions.append((req_id, title, req_text, source_attribution, str(filepath)))
+
+    except Exception as e:
+        print(f"Warning: Could not parse {filepath}: {e}", file=sys.stderr)
+
+    return definitions
+
+def extract_req_edges(definitions):
+    """
+    Cross-references between requirements: one (from_req_id, to_req_id, flow_file)
+    for every other $REQ_ID mentioned in a definition's title or text.
+    from_req_id depends on to_req_id.
+    """
+    edges = []
+    for req_id, title, req_text, source_attribution, flow_file in definitions:
+        seen = set()
+        for match in REQ_ID_TEXT_PATTERN.finditer(f"{title}\n{req_text}"):
+            to_req_id = match.group()
+            if to_req_id != req_id and to_req_id not in seen:
+                seen.add(to_req_id)
+                edges.append((req_id, to_req_id, flow_file))
+    return edges
+
+def load_scan_config(config_path=None):
+    """
+    Load the scan configuration.
+
+    Reads config_path, or ./req-index.json if it exists; keys that are not
+    given fall back to DEFAULT_SCAN_CONFIG. "exclude" patterns are appended
+    to the default ones rather than replacing them, so a negated pattern
+    such as "!target/" is the way to scan a default-excluded directory.
+    Raises ValueError on a bad file.
+    """
+    config = dict(DEFAULT_SCAN_CONFIG)
+    if config_path is None:
+        if not os.path.exists(SCAN_CONFIG_PATH):
+            return config
+        config_path = SCAN_CONFIG_PATH
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Could not read scan config {config_path}: {e}")
+
+    if not isinstance(overrides, dict):
+        raise ValueError(f"Scan config {config_path} must be a JSON object")
+    unknown = set(overrides) - set(DEFAULT_SCAN_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown keys in {config_path}: {', '.join(sorted(unknown))}")
+    for key in ('roots', 'exclude'):
+        if not isinstance(overrides.get(key, []), list):
+            raise ValueError(f"'{key}' in {config_path} must be a list")
+    for root in overrides.get('roots', []):
+        if not isinstance(root, dict) or not {'path', 'category', 'extensions'} <= set(root):
+            raise ValueError(f"Each root in {config_path} needs 'path', 'category' and 'extensions'")
+
+    config.update(overrides)
+    config['exclude'] = DEFAULT_SCAN_CONFIG['exclude'] + overrides.get('exclude', [])
+    return config
+
+def parse_ignore_patterns(lines, base):
+    """
+    Parse .gitignore-style lines into rules relative to base (a '/'-separated
+    path from the project root, '' for the root itself).
+
+    Each rule is (base, pattern, negated, dir_only, anchored).
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if line.startswith('**/'):
+            line = line[3:]
+        # A slash anywhere but the end anchors the pattern to base
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if line:
+            rules.append((base, line, negated, dir_only, anchored))
+    return rules
+
+def is_ignored(relpath, is_dir, rules):
+    """Apply ignore rules to a '/'-separated path from the project root; the last match wins."""
+    ignored = False
+    for base, pattern, negated, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not relpath.startswith(base + '/'):
+                continue
+            subpath = relpath[len(base) + 1:]
+        else:
+            subpath = relpath
+        target = subpath if anchored else subpath.rsplit('/', 1)[-1]
+        if fnmatch.fnmatchcase(target, pattern):
+            ignored = not negated
+    return ignored
+
+def read_gitignore(directory, base):
+    """Rules from directory/.gitignore, if there is one."""
+    gitignore = os.path.join(directory, '.gitignore')
+    if not os.path.isfile(gitignore):
+        return []
+    with open(gitignore, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_ignore_patterns(f, base)
+
+def to_relpath(path):
+    """Normalize a path under the project root to 'a/b/c' form ('' for the root)."""
+    relpath = os.path.normpath(path).replace(os.sep, '/')
+    return '' if relpath == '.' else relpath
+
+def collect_index_files(config=None):
+    """Find every file the index covers. Returns {filespec: (category, is_flow_file)}."""
+    if config is None:
+        config = load_scan_config()
+
+    files = {}
+
+    # Flow files directly in ./reqs/ hold definitions as well as locations
+    if os.path.exists('./reqs'):
+        for req_file in Path('./reqs').glob('*.md'):
+            files[str(req_file)] = ('reqs', True)
+
+    base_rules = parse_ignore_patterns(config['exclude'], '')
+    if config['use_gitignore']:
+        base_rules += read_gitignore('.', '')
+
+    for root_config in config['roots']:
+        directory = root_config['path']
+        category = root_config['category']
+        extensions = tuple(root_config['extensions'])
+        if not os.path.isdir(directory):
+            continue
+
+        rules_by_dir = {}
+        for root, dirs, filenames in os.walk(directory):
+            rel_root = to_relpath(root)
+            rules = rules_by_dir.pop(root, base_rules)
+            if config['use_gitignore']:
+                rules = rules + read_gitignore(root, rel_root)
+
+            # Prune ignored directories so the walk never descends into them
+            kept = []
+            for name in dirs:
+                rel_dir = f"{rel_root}/{name}" if rel_root else name
+                if not is_ignored(rel_dir, True, rules):
+                    kept.append(name)
+                    rules_by_dir[os.path.join(root, name)] = rules
+            dirs[:] = kept
+
+            for filename in filenames:
+                if not filename.endswith(extensions):
+                    continue
+                rel_file = f"{rel_root}/{filename}" if rel_root else filename
+                if is_ignored(rel_file, False, rules):
+                    continue
+                filespec = str(Path(root) / filename)
+                files.setdefault(filespec, (category, False))
+
+    return files
+
+def file_sha256(filespec):
+    """Hash a file's content."""
+    with open(filespec, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def index_file(filespec, category, is_flow_file):
+    """Read and parse one file. Returns (sha256, definitions, locations)."""
+    try:
+        with open(filespec, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < MMAP_MIN_SIZE:
+                return parse_file_bytes(filespec, category, is_flow_file, f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return parse_file_bytes(filespec, category, is_flow_file, data)
+    except OSError as e:
+        print(f"Warning: Could not read {filespec}: {e}", file=sys.stderr)
+        return None, [], []
+
+def parse_file_bytes(filespec, category, is_flow_file, data):
+    """Hash and parse a file's bytes (or mmap). Returns (sha256, definitions, locations)."""
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    # Most code files have no tags at all -- skip them without decoding or matching
+    if data.find(REQ_TAG_PREFIX) == -1:
+        return sha256, [], []
+
+    definitions = []
+    if is_flow_file:
+        try:
+            content = bytes(data).decode('utf-8')
+        except UnicodeDecodeError as e:
+            print(f"Warning: Could not parse {filespec}: {e}", file=sys.stderr)
+        else:
+            definitions = extract_req_definitions(filespec, content)
+
+    locations = extract_req_locations(filespec, category, data)
+    return sha256, definitions, locations
+
+def create_schema(cursor):
+    """Create tables and indexes in an empty database."""
+    cursor.execute('''
+        CREATE TABLE req_definitions (
+            req_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL DEFAULT '',
+            req_text TEXT NOT NULL,
+            source_attribution TEXT,
+            flow_file TEXT NOT NULL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE req_locations (
+            req_id TEXT NOT NULL,
+            filespec TEXT NOT NULL,
+            line_num INTEGER NOT NULL,
+            category TEXT NOT NULL
+        )
+    ''')
+
+    # One row per scanned file, used to detect changes on incremental runs
+    cursor.execute('''
+        CREATE TABLE indexed_files (
+            filespec TEXT PRIMARY KEY,
+            category TEXT NOT NULL,
+            is_flow_file INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT
+        )
+    ''')
+
+    cursor.execute('CREATE INDEX idx_loc_req_id ON req_locations(req_id)')
+    cursor.execute('CREATE INDEX idx_loc_category ON req_locations(category)')
+    cursor.execute('CREATE INDEX idx_loc_filespec ON req_locations(filespec)')
+    # Requirement cross-references: from_req_id's definition mentions to_req_id
+    cursor.execute('''
+        CREATE TABLE req_edges (
+            from_req_id TEXT NOT NULL,
+            to_req_id TEXT NOT NULL,
+            flow_file TEXT NOT NULL,
+            PRIMARY KEY (from_req_id, to_req_id)
+        )
+    ''')
+
+    # Per-requirement coverage summary, maintained by refresh_coverage().
+    # status is one of COVERAGE_STATUSES:
+    #   orphan    -- not defined, but tagged in tests or code
+    #   undefined -- not defined, only referenced from ./reqs/
+    #   untested  -- defined, no test location
+    #   tested    -- defined and tested, no code location
+    #   complete  -- defined, tested and implemented
+    cursor.execute('''
+        CREATE TABLE req_coverage (
+            req_id TEXT PRIMARY KEY,
+            defined INTEGER NOT NULL,
+            flow_file TEXT,
+            reqs_count INTEGER NOT NULL,
+            tests_count INTEGER NOT NULL,
+            code_count INTEGER NOT NULL,
+            status TEXT NOT NULL
+        )
+    ''')
+
+    cursor.execute('CREATE INDEX idx_def_flow_file ON req_definitions(flow_file)')
+    cursor.execute('CREATE INDEX idx_cov_status ON req_coverage(status)')
+    cursor.execute('CREATE INDEX idx_edge_to ON req_edges(to_req_id)')
+    cursor.execute('CREATE INDEX idx_edge_flow_file ON req_edges(flow_file)')
+
+    create_search_index(cursor)
+
+    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+def create_search_index(cursor):
+    """
+    Create the full-text index over requirement definitions.
+
+    req_search is an FTS5 table backed by req_definitions (external content),
+    kept in sync by triggers, so incremental updates maintain it for free.
+    Skipped with a warning if this SQLite build lacks FTS5.
+    """
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE req_search USING fts5(
+                req_id, title, req_text, source_attribution, flow_file UNINDEXED,
+                content='req_definitions', content_rowid='rowid',
+                tokenize='porter unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Warning: Full-text search unavailable ({e}); req_search not created", file=sys.stderr)
+        return
+
+    cursor.execute('''
+        CREATE TRIGGER req_definitions_ai AFTER INSERT ON req_definitions BEGIN
+            INSERT INTO req_search (rowid, req_id, title, req_text, source_attribution, flow_file)
+            VALUES (new.rowid, new.req_id, new.title, new.req_text, new.source_attribution, new.flow_file);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER req_definitions_ad AFTER DELETE ON req_definitions BEGIN
+            INSERT INTO req_search (req_search, rowid, req_id, title, req_text, source_attribution, flow_file)
+            VALUES ('delete', old.rowid, old.req_id, old.title, old.req_text, old.source_attribution, old.flow_file);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER req_definitions_au AFTER UPDATE ON req_definitions BEGIN
+            INSERT INTO req_search (req_search, rowid, req_id, title, req_text, source_attribution, flow_file)
+            VALUES ('delete', old.rowid, old.req_id, old.title, old.req_text, old.source_attribution, old.flow_file);
+            INSERT INTO req_search (rowid, req_id, title, req_text, source_attribution, flow_file)
+            VALUES (new.rowid, new.req_id, new.title, new.req_text, new.source_attribution, new.flow_file);
+        END
+    ''')
+
+def refresh_coverage(cursor, req_ids=None):
+    """
+    Recompute req_coverage rows for req_ids (an iterable), or for every
+    $REQ_ID in the index if req_ids is None.
+    """
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS affected_ids (req_id TEXT PRIMARY KEY)')
+    cursor.execute('DELETE FROM affected_ids')
+    if req_ids is None:
+        cursor.execute('DELETE FROM req_coverage')
+        cursor.execute('''
+            INSERT INTO affected_ids
+            SELECT req_id FROM req_definitions
+            UNION SELECT req_id FROM req_locations
+        ''')
+    else:
+        cursor.executemany('INSERT OR IGNORE INTO affected_ids VALUES (?)', ((req_id,) for req_id in req_ids))
+        cursor.execute('DELETE FROM req_coverage WHERE req_id IN (SELECT req_id FROM affected_ids)')
+
+    cursor.execute('''
+        INSERT INTO req_coverage (req_id, defined, flow_file, reqs_count, tests_count, code_count, status)
+        SELECT req_id, defined, flow_file, reqs_count, tests_count, code_count,
+               CASE
+                   WHEN NOT defined AND tests_count + code_count > 0 THEN 'orphan'
+                   WHEN NOT defined THEN 'undefined'
+                   WHEN tests_count = 0 THEN 'untested'
+                   WHEN code_count = 0 THEN 'tested'
+                   ELSE 'complete'
+               END
+        FROM (
+            SELECT a.req_id AS req_id,
+                   d.req_id IS NOT NULL AS defined,
+                   d.flow_file AS flow_file,
+                   COALESCE(l.reqs_count, 0) AS reqs_count,
+                   COALESCE(l.tests_count, 0) AS tests_count,
+                   COALESCE(l.code_count, 0) AS code_count
+            FROM affected_ids a
+            LEFT JOIN req_definitions d ON d.req_id = a.req_id
+            LEFT JOIN (
+                SELECT req_id,
+                       SUM(category = 'reqs') AS reqs_count,
+                       SUM(category = 'tests') AS tests_count,
+                       SUM(category = 'code') AS code_count
+                FROM req_locations
+                WHERE req_id IN (SELECT req_id FROM affected_ids)
+                GROUP BY req_id
+            ) l ON l.req_id = a.req_id
+            WHERE d.req_id IS NOT NULL OR l.req_id IS NOT NULL
+        )
+    ''')
+    cursor.execute('DELETE FROM affected_ids')
+
+def _load_seed_ids(conn, req_ids):
+    """Put req_ids into the temp table impact_seed (works on read-only connections)."""
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS impact_seed (req_id TEXT PRIMARY KEY)')
+    conn.execute('DELETE FROM impact_seed')
+    conn.executemany('INSERT OR IGNORE INTO impact_seed VALUES (?)', ((req_id,) for req_id in req_ids))
+
+IMPACT_CTE = '''
+    WITH RECURSIVE impact(req_id) AS (
+        SELECT req_id FROM impact_seed
+        UNION
+        SELECT e.from_req_id FROM req_edges e JOIN impact i ON e.to_req_id = i.req_id
+    )
+'''
+
+def dependents(conn, req_ids):
+    """Every requirement that depends on any of req_ids, directly or transitively (sorted)."""
+    _load_seed_ids(conn, req_ids)
+    rows = conn.execute(IMPACT_CTE + '''
+        SELECT req_id FROM impact
+        WHERE req_id NOT IN (SELECT req_id FROM impact_seed)
+        ORDER BY req_id
+    ''').fetchall()
+    return [row[0] for row in rows]
+
+def impact_set(conn, req_ids):
+    """req_ids plus all their transitive dependents (sorted)."""
+    _load_seed_ids(conn, req_ids)
+    rows = conn.execute(IMPACT_CTE + 'SELECT req_id FROM impact ORDER BY req_id').fetchall()
+    return [row[0] for row in rows]
+
+def retest_files(conn, req_ids):
+    """Test files tagged with any requirement in the impact set of req_ids (sorted)."""
+    _load_seed_ids(conn, req_ids)
+    rows = conn.execute(IMPACT_CTE + '''
+        SELECT DISTINCT l.filespec
+        FROM req_locations l JOIN impact i ON l.req_id = i.req_id
+        WHERE l.category = 'tests'
+        ORDER BY l.filespec
+    ''').fetchall()
+    return [row[0] for row in rows]
+
+def query_server(query, params=()):
+    """
+    Run a read-only query on the query server.
+
+    Returns the rows as tuples, or None if the server can't answer (not
+    running, unreachable, a garbled reply or a server-side failure); the
+    caller should then read the database itself. Errors the server reports
+    for the query itself are raised as sqlite3.OperationalError.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(SOCKET_PATH):
+        return None
+
+    request = json.dumps({'sql': query, 'params': list(params)}).encode('utf-8') + b'\n'
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(SOCKET_TIMEOUT)
+            sock.connect(SOCKET_PATH)
+            sock.sendall(request)
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(response, dict):
+        return None
+    if 'error' in response:
+        if response.get('query_error'):
+            raise sqlite3.OperationalError(response['error'])
+        return None
+    rows = response.get('rows')
+    if not isinstance(rows, list):
+        return None
+    return [tuple(row) for row in rows]
+
+def query_index(query, params=()):
+    """Run a read-only query, through the query server when one is running."""
+    rows = query_server(query, params)
+    if rows is not None:
+        return rows
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+def open_existing_index(db_path):
+    """Open the database for an incremental update, or return None if it can't be reused."""
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+    except sqlite3.DatabaseError:
+        conn.close()
+        return None
+    if version != SCHEMA_VERSION:
+        conn.close()
+        return None
+    return conn
+
+def plan_changes(cursor, current_files):
+    """
+    Compare the files on disk against indexed_files.
+
+    Returns (to_parse, to_touch, removed):
+        to_parse: {filespec: (category, is_flow_file, stat)} -- new or changed content
+        to_touch: {filespec: stat} -- stat changed but content is identical
+        removed:  [filespec] -- indexed before, gone (or no longer covered) now
+    """
+    indexed = {}
+    for filespec, category, is_flow_file, mtime_ns, size, sha256 in cursor.execute(
+            'SELECT filespec, category, is_flow_file, mtime_ns, size, sha256 FROM indexed_files'):
+        indexed[filespec] = (category, bool(is_flow_file), mtime_ns, size, sha256)
+
+    to_parse = {}
+    to_touch = {}
+    for filespec, (category, is_flow_file) in current_files.items():
+        try:
+            stat = os.stat(filespec)
+        except OSError:
+            continue
+
+        known = indexed.get(filespec)
+        if known is None or known[0] != category or known[1] != is_flow_file:
+            to_parse[filespec] = (category, is_flow_file, stat)
+            continue
+        if known[2] == stat.st_mtime_ns and known[3] == stat.st_size:
+            continue
+
+        # Stat changed -- only re-parse if the content did too
+        if file_sha256(filespec) == known[4]:
+            to_touch[filespec] = stat
+        else:
+            to_parse[filespec] = (category, is_flow_file, stat)
+
+    removed = [filespec for filespec in indexed if filespec not in current_files]
+    return to_parse, to_touch, removed
+
+def index_chunk(chunk):
+    """Index a chunk of (filespec, category, is_flow_file). Runs in worker processes."""
+    return [(filespec,) + index_file(filespec, category, is_flow_file)
+            for filespec, category, is_flow_file in chunk]
+
+def parse_files(work, jobs=None):
+    """
+    Index every (filespec, category, is_flow_file) in work.
+
+    Large batches are split into chunks and spread over a process pool; the
+    results are merged in input order. Returns [(filespec, sha256, definitions, locations)].
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(work) < PARALLEL_MIN_FILES:
+        return index_chunk(work)
+
+    chunks = [work[i:i + CHUNK_SIZE] for i in range(0, len(work), CHUNK_SIZE)]
+    results = []
+    # Workers get our cwd explicitly: filespecs are relative, and spawned
+    # (Windows) workers re-run the main script's top level, which may change directory
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=os.chdir, initargs=(os.getcwd(),)) as executor:
+        for chunk_results in executor.map(index_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+def apply_changes(cursor, to_parse, to_touch, removed, jobs=None):
+    """
+    Replace the rows of changed and removed files with freshly parsed ones.
+
+    Returns the set of $REQ_IDs whose definitions or locations changed.
+    """
+    affected = set()
+
+    # Delete everything first, so a $REQ_ID that moved between files doesn't collide
+    for filespec in list(to_parse) + removed:
+        cursor.execute('SELECT req_id FROM req_definitions WHERE flow_file = ?', (filespec,))
+        affected.update(row[0] for row in cursor.fetchall())
+        cursor.execute('SELECT DISTINCT req_id FROM req_locations WHERE filespec = ?', (filespec,))
+        affected.update(row[0] for row in cursor.fetchall())
+        cursor.execute('DELETE FROM req_definitions WHERE flow_file = ?', (filespec,))
+        cursor.execute('DELETE FROM req_edges WHERE flow_file = ?', (filespec,))
+        cursor.execute('DELETE FROM req_locations WHERE filespec = ?', (filespec,))
+        cursor.execute('DELETE FROM indexed_files WHERE filespec = ?', (filespec,))
+
+    work = [(filespec, category, is_flow_file)
+            for filespec, (category, is_flow_file, stat) in sorted(to_parse.items())]
+
+    definitions = []
+    locations = []
+    file_rows = []
+    for filespec, sha256, file_definitions, file_locations in parse_files(work, jobs):
+        category, is_flow_file, stat = to_parse[filespec]
+        definitions.extend(file_definitions)
+        locations.extend(file_locations)
+        file_rows.append((filespec, category, int(is_flow_file), stat.st_mtime_ns, stat.st_size, sha256))
+
+    # Insert definitions
+    cursor.executemany('''
+        INSERT INTO req_definitions (req_id, title, req_text, source_attribution, flow_file)
+        VALUES (?, ?, ?, ?, ?)
+    ''', definitions)
+
+    # Insert cross-references
+    cursor.executemany('''
+        INSERT INTO req_edges (from_req_id, to_req_id, flow_file)
+        VALUES (?, ?, ?)
+    ''', extract_req_edges(definitions))
+
+    # Insert locations
+    cursor.executemany('''
+        INSERT INTO req_locations (req_id, filespec, line_num, category)
+        VALUES (?, ?, ?, ?)
+    ''', locations)
+
+    # Record what was indexed
+    cursor.executemany('''
+        INSERT INTO indexed_files (filespec, category, is_flow_file, mtime_ns, size, sha256)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', file_rows)
+
+    cursor.executemany(
+        'UPDATE indexed_files SET mtime_ns = ?, size = ? WHERE filespec = ?',
+        [(stat.st_mtime_ns, stat.st_size, filespec) for filespec, stat in to_touch.items()]
+    )
+
+    affected.update(definition[0] for definition in definitions)
+    affected.update(location[0] for location in locations)
+    return affected
+
+def publish_index(build_path, db_path):
+    """Atomically move a finished database over db_path, retrying while it is locked."""
+    deadline = time.time() + REPLACE_TIMEOUT
+    delay = 0.05
+    while True:
+        try:
+            os.replace(build_path, db_path)
+            return
+        except PermissionError:
+            if time.time() >= deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+def build_index(incremental=False, jobs=None, quiet=False, config_path=None):
+    """
+    Build the requirements index database.
+
+    A full build writes a new database next to DB_PATH and renames it over
+    the old one when complete, so readers always see either the previous
+    index or the new one -- never a missing or half-built file.
+
+    With incremental=True an existing database is updated in place: only files
+    added, removed or changed since the last run are re-parsed, all in one
+    transaction. Falls back to a full rebuild if there is no usable database.
+
+    jobs caps the worker processes used to parse files (default: CPU count,
+    1 = no pool). config_path overrides ./req-index.json. quiet suppresses
+    the summary.
+    """
+    start_time = time.time()
+
+    # Create tmp directory
+    os.makedirs('./tmp', exist_ok=True)
+    db_path = DB_PATH
+
+    conn = open_existing_index(db_path) if incremental else None
+    mode = 'incremental'
+    build_path = None
+
+    if conn is None:
+        mode = 'full'
+
+        # Build into a private file; the current database stays readable
+        build_path = f"{db_path}.building-{os.getpid()}"
+        if os.path.exists(build_path):
+            os.remove(build_path)
+
+        conn = sqlite3.connect(build_path)
+        for pragma in BULK_BUILD_PRAGMAS:
+            conn.execute(pragma)
+        create_schema(conn.cursor())
+
+    cursor = conn.cursor()
+    current_files = collect_index_files(load_scan_config(config_path))
+
+    try:
+        to_parse, to_touch, removed = plan_changes(cursor, current_files)
+        affected = apply_changes(cursor, to_parse, to_touch, removed, jobs)
+        refresh_coverage(cursor, None if mode == 'full' else affected)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        if build_path and os.path.exists(build_path):
+            os.remove(build_path)
+        raise
+
+    # Print summary
+    cursor.execute('SELECT COUNT(DISTINCT req_id) FROM req_definitions')
+    def_count = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "reqs"')
+    reqs_loc_count = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "tests"')
+    tests_loc_count = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM req_locations WHERE category = "code"')
+    code_loc_count = cursor.fetchone()[0]
+
+    cursor.execute('SELECT status, COUNT(*) FROM req_coverage GROUP BY status')
+    status_counts = dict(cursor.fetchall())
+
+    conn.close()
+
+    if build_path:
+        publish_index(build_path, db_path)
+
+    if quiet:
+        return
+
+    elapsed_ms = (time.time() - start_time) * 1000
+    print(f"Requirements index built: {db_path} ({mode}, {elapsed_ms:.0f} ms)")
+    print(f"  Files:       {len(current_files)} scanned, {len(to_parse)} parsed, {len(removed)} removed")
+    print(f"  Definitions: {def_count} unique $REQ_IDs")
+    print(f"  Locations:   {reqs_loc_count} in ./reqs/, {tests_loc_count} in ./tests/, {code_loc_count} in ./code/")
+    print(f"  Coverage:    " + ', '.join(
+        f"{status_counts.get(status, 0)} {status}" for status in COVERAGE_STATUSES))
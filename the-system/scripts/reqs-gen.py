@@ -20,7 +20,7 @@ import hashlib
 import argparse
 from datetime import datetime
 from pathlib import Path
-import concurrent.futures
+import asyncio
 
 # Change to project root (two levels up from this script)
 script_dir = Path(__file__).parent
@@ -29,7 +29,12 @@ os.chdir(project_root)
 
 # Import the agentic coder wrapper (already in same Python environment)
 sys.path.insert(0, str(script_dir))
-from prompt_agentic_coder import get_ai_response_text
+from prompt_agentic_coder import get_ai_response_text, get_ai_response_text_async
+from req_id_fixer import fix_unique_req_ids
+
+# What the prompts read besides their @file references; part of the response cache key (--cache)
+README_INPUTS = ['./README.md', './readme']
+REQS_INPUTS = README_INPUTS + ['./reqs']
 
 def find_most_recent_report():
     """Find the most recent report file in ./reports/ directory."""
@@ -83,7 +88,7 @@ def run_check_readmes():
     print(f"   (Prompt: @the-system/prompts/req-check_readmes.md)")
 
     try:
-        response = get_ai_response_text(prompt, report_type="req-check_readmes")
+        response = get_ai_response_text(prompt, report_type="req-check_readmes", cache_inputs=README_INPUTS)
         print(f"← Command finished successfully\n")
 
         # Check if README changes are required
@@ -102,7 +107,7 @@ def find_fix_prompts():
     fix_prompts = sorted(prompts_dir.glob('req-fix_*.md'))
     return [str(p) for p in fix_prompts]
 
-def run_single_fix_prompt(prompt_path):
+async def run_single_fix_prompt(prompt_path):
     """Run a single fix prompt. Returns dict with results."""
     prompt_name = Path(prompt_path).stem
 
@@ -110,7 +115,7 @@ def run_single_fix_prompt(prompt_path):
 
     try:
         prompt = f"Please follow these instructions: @{prompt_path}"
-        response = get_ai_response_text(prompt, report_type=prompt_name)
+        response = await get_ai_response_text_async(prompt, report_type=prompt_name, cache_inputs=REQS_INPUTS)
 
         readme_changes_required = "**README_CHANGES_REQUIRED: true**" in response
 
@@ -148,26 +153,20 @@ def run_all_fix_prompts_in_parallel():
         print(f"  - {p}")
     print("\nLaunching parallel execution...\n")
 
-    # Run all fix prompts in parallel using ThreadPoolExecutor
+    # Run all fix prompts concurrently on one event loop
+    # (at most PROMPT_AGENTIC_MAX_CONCURRENCY agents at a time)
     readme_changes_required = False
     failed_prompts = []
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(fix_prompts)) as executor:
-        # Submit all prompts
-        future_to_prompt = {
-            executor.submit(run_single_fix_prompt, prompt_path): prompt_path
-            for prompt_path in fix_prompts
-        }
-
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_prompt):
-            result = future.result()
+    async def run_all():
+        return await asyncio.gather(*(run_single_fix_prompt(prompt_path) for prompt_path in fix_prompts))
 
-            if not result['success']:
-                failed_prompts.append(result['prompt_name'])
+    for result in asyncio.run(run_all()):
+        if not result['success']:
+            failed_prompts.append(result['prompt_name'])
 
-            if result['readme_changes_required']:
-                readme_changes_required = True
+        if result['readme_changes_required']:
+            readme_changes_required = True
 
     print()
 
@@ -203,28 +202,22 @@ def compute_reqs_hash():
     return hasher.hexdigest()
 
 def run_fix_unique_ids():
-    """Run fix-unique-req-ids.py to auto-fix duplicate IDs."""
+    """Auto-fix duplicate IDs (in-process, see req_id_fixer.py)."""
     print("\n" + "=" * 60)
     print("PRE-CHECK: FIXING DUPLICATE REQ IDs")
     print("=" * 60 + "\n")
 
-    cmd = ['uv', 'run', '--script', './the-system/scripts/fix-unique-req-ids.py']
-    print(f"→ Running command: {' '.join(cmd)}")
-
-    result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-
-    print(f"← Command finished with exit code: {result.returncode}")
-
-    # Show output directly (no report needed since this doesn't use AI)
-    if result.stdout:
-        print(result.stdout)
-    if result.stderr:
-        print("STDERR:", result.stderr)
-
-    if result.returncode != 0:
-        print(f"\nERROR: fix-unique-req-ids.py failed with exit code {result.returncode}")
+    try:
+        plan, references = fix_unique_req_ids()
+    except Exception as e:
+        print(f"\nERROR: Fixing duplicate requirement IDs failed: {e}")
         sys.exit(1)
 
+    if plan:
+        print(f"\n✓ Fixed {len(plan)} duplicate requirement ID(s), {len(references)} reference(s) updated")
+    else:
+        print("✓ No duplicate requirement IDs found")
+
     print()
 
 def run_write_reqs():
@@ -240,7 +233,7 @@ def run_write_reqs():
     print(f"→ Running: prompt_agentic_coder.get_ai_response_text()")
 
     try:
-        result = get_ai_response_text(prompt, report_type="write_reqs")
+        result = get_ai_response_text(prompt, report_type="write_reqs", cache_inputs=REQS_INPUTS)
         print(f"← Command finished successfully\n")
     except Exception as e:
         print(f"\nERROR: get_ai_response_text failed: {e}")
@@ -248,13 +241,15 @@ def run_write_reqs():
 
     print("✓ Phase 1 complete\n")
 
-def run_cleanup():
+def run_cleanup(keep_agent_cache=False):
     """Run cleanup.py to remove reports and tmp directories."""
     print("\n" + "=" * 60)
     print("CLEANUP: REMOVING OLD REPORTS AND TMP")
     print("=" * 60 + "\n")
 
     cmd = ['uv', 'run', '--script', './the-system/scripts/cleanup.py']
+    if keep_agent_cache:
+        cmd.append('--keep-agent-cache')
     result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=60)
 
     print(result.stdout)
@@ -273,14 +268,20 @@ def main():
     parser = argparse.ArgumentParser(description='Generate requirements from README documentation')
     parser.add_argument('--skip-readme-check', action='store_true',
                        help='Skip the initial README quality check')
+    parser.add_argument('--cache', action='store_true',
+                       help='Replay agent responses for prompts whose inputs have not changed '
+                            '(cached in ./tmp/agent-cache)')
     args = parser.parse_args()
 
+    if args.cache:
+        os.environ['PROMPT_AGENTIC_CACHE'] = '1'
+
     print("\n" + "=" * 60)
     print("REQUIREMENTS GENERATION")
     print("=" * 60)
 
     # Clean up old reports and tmp before starting
-    run_cleanup()
+    run_cleanup(keep_agent_cache=args.cache)
 
     # Create necessary directories
     os.makedirs('./reqs', exist_ok=True)
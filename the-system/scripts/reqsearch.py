@@ -0,0 +1,146 @@
+#!/usr/bin/env uvrun
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+
+import sys
+# Fix Windows console encoding for Unicode characters
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+import os
+import re
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+
+# Change to project root (two levels up from this script)
+script_dir = Path(__file__).parent
+project_root = script_dir.parent.parent
+os.chdir(project_root)
+
+sys.path.insert(0, str(script_dir))
+from req_index import DB_PATH, query_index
+
+# bm25 column weights: req_id, title, req_text, source_attribution, flow_file
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0, 0.5, 0.0)
+
+def build_match_query(terms, any_term=False):
+    """
+    Turn plain search terms into an FTS5 MATCH expression.
+
+    Each term is quoted, so punctuation in $REQ_IDs and file names is taken
+    literally; terms are combined with AND (or OR with any_term).
+    """
+    tokens = []
+    for term in terms:
+        for word in term.split():
+            word = word.replace('"', '""')
+            # A trailing * keeps its prefix-search meaning
+            if word.endswith('*') and len(word) > 1:
+                tokens.append(f'"{word[:-1]}"*')
+            else:
+                tokens.append(f'"{word}"')
+    return (' OR ' if any_term else ' ').join(tokens)
+
+def search_reqs(match_query, limit=20, flow_file=None):
+    """
+    Search requirement definitions, best match first.
+
+    Returns [(req_id, title, flow_file, snippet, score)]; the snippet marks
+    matched words with [ ]. Lower (more negative) scores rank higher.
+    """
+    if not os.path.exists(DB_PATH):
+        print(f"ERROR: Requirements database not found at {DB_PATH}", file=sys.stderr)
+        print("Run: uv run --script ./the-system/scripts/build-req-index.py", file=sys.stderr)
+        sys.exit(1)
+
+    exists = query_index("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'req_search'")
+    if not exists:
+        print("ERROR: Full-text index (req_search) not found in the requirements database", file=sys.stderr)
+        print("Rebuild it with an SQLite that supports FTS5:", file=sys.stderr)
+        print("  uv run --script ./the-system/scripts/build-req-index.py", file=sys.stderr)
+        sys.exit(1)
+
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+    query = f'''
+        SELECT req_id, title, flow_file,
+               snippet(req_search, 2, '[', ']', '...', 16),
+               bm25(req_search, {weights}) AS score
+        FROM req_search
+        WHERE req_search MATCH ?
+    '''
+    params = [match_query]
+    if flow_file:
+        query += ' AND flow_file = ?'
+        params.append(flow_file)
+    query += ' ORDER BY score LIMIT ?'
+    params.append(limit)
+
+    return query_index(query, params)
+
+def print_results(terms, results):
+    """Print ranked results in the same layout as reqtrace.py."""
+    print("=" * 70)
+    print(f"REQUIREMENT SEARCH: {' '.join(terms)}")
+    print("=" * 70)
+    print()
+
+    if not results:
+        print("No matching requirements")
+        print()
+        print("=" * 70)
+        return
+
+    for rank, (req_id, title, flow_file, snippet, score) in enumerate(results, 1):
+        print(f"{rank:>3}. {req_id}: {title}")
+        snippet = re.sub(r'\s+', ' ', snippet).strip()
+        print(f"     {flow_file}  (score {-score:.2f})")
+        print(f"     {snippet}")
+        print()
+
+    print("=" * 70)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Search requirement definitions in the requirements index (ranked by relevance)',
+        epilog='Examples:\n'
+               '  reqsearch.py search path\n'
+               '  reqsearch.py --any timeout retry\n'
+               '  reqsearch.py "launch*" --flow reqs/basic.md\n'
+               '  reqsearch.py --raw "title:search NOT windows"',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('terms', nargs='+', help='Words to search for (all must match)')
+    parser.add_argument('--any', action='store_true', help='Match requirements containing any of the words')
+    parser.add_argument('--raw', action='store_true', help='Pass the terms through as an FTS5 query expression')
+    parser.add_argument('--flow', default=None, metavar='FILE', help='Only search definitions from this flow file')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of results (default: 20)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if args.raw:
+        match_query = ' '.join(args.terms)
+    else:
+        match_query = build_match_query(args.terms, any_term=args.any)
+
+    flow_file = str(Path(args.flow)) if args.flow else None
+    try:
+        results = search_reqs(match_query, limit=args.limit, flow_file=flow_file)
+    except sqlite3.OperationalError as e:
+        print(f"ERROR: Invalid search query: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps([
+            {'req_id': req_id, 'title': title, 'flow_file': flow, 'snippet': snippet, 'score': -score}
+            for req_id, title, flow, snippet, score in results
+        ], ensure_ascii=False, indent=2))
+    else:
+        print_results(args.terms, results)
+
+if __name__ == '__main__':
+    main()
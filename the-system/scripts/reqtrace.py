@@ -11,7 +11,9 @@ if sys.stdout.encoding != 'utf-8':
     sys.stderr.reconfigure(encoding='utf-8')
 
 import os
+import json
 import sqlite3
+import argparse
 from pathlib import Path
 
 # Change to project root (two levels up from this script)
@@ -19,36 +21,135 @@ script_dir = Path(__file__).parent
 project_root = script_dir.parent.parent
 os.chdir(project_root)
 
-def query_db(query, params=()):
-    """Execute a query against the requirements database."""
-    db_path = './tmp/reqs.sqlite'
-    if not os.path.exists(db_path):
+sys.path.insert(0, str(script_dir))
+from req_index import dependents, retest_files, query_index
+
+def require_db():
+    """Exit with instructions if the requirements database is missing."""
+    if not os.path.exists('./tmp/reqs.sqlite'):
         print("ERROR: Requirements database not found at ./tmp/reqs.sqlite", file=sys.stderr)
         print("Run: uv run --script ./the-system/scripts/build-req-index.py", file=sys.stderr)
         sys.exit(1)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
-    return results
-
-def trace_req_id(req_id):
-    """Trace a requirement ID and return all information."""
-    # Get definition
-    definition = query_db(
-        "SELECT req_text, source_attribution, flow_file FROM req_definitions WHERE req_id = ?",
-        (req_id,)
-    )
+def open_db():
+    """Open the requirements database, or exit with instructions if it is missing."""
+    require_db()
+    return sqlite3.connect('./tmp/reqs.sqlite')
 
-    # Get all locations
-    locations = query_db(
-        "SELECT filespec, line_num, category FROM req_locations WHERE req_id = ? ORDER BY category, filespec",
-        (req_id,)
-    )
+GLOB_CHARS = '*?['
+
+# IDs per IN (...) query when tracing a list, well under SQLite's parameter limit
+TRACE_BATCH_SIZE = 500
+
+# Coverage filters: option name -> condition on req_coverage
+COVERAGE_FILTERS = {
+    'untested': "defined AND tests_count = 0",
+    'unimplemented': "defined AND code_count = 0",
+    'orphan': "status = 'orphan'",
+}
+
+def glob_prefix_range(pattern):
+    """
+    Literal prefix of a glob pattern as a half-open range [low, high), so the
+    req_coverage primary key can be range-scanned; (None, None) if the
+    pattern starts with a wildcard.
+    """
+    cut = min((pattern.index(c) for c in GLOB_CHARS if c in pattern), default=len(pattern))
+    prefix = pattern[:cut]
+    if not prefix:
+        return None, None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
-    return definition, locations
+def select_req_ids(patterns=None, filters=()):
+    """
+    IDs from req_coverage matching any of the glob patterns (all IDs if
+    patterns is None) and every filter in COVERAGE_FILTERS, sorted. Runs on
+    the query server when one is running.
+    """
+    conditions = []
+    params = []
+    if patterns is not None:
+        alternatives = []
+        for pattern in patterns:
+            low, high = glob_prefix_range(pattern)
+            if low is None:
+                alternatives.append("req_id GLOB ?")
+                params.append(pattern)
+            else:
+                alternatives.append("(req_id >= ? AND req_id < ? AND req_id GLOB ?)")
+                params += [low, high, pattern]
+        conditions.append('(' + ' OR '.join(alternatives) + ')')
+    conditions += [COVERAGE_FILTERS[name] for name in filters]
+
+    query = 'SELECT req_id FROM req_coverage'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY req_id'
+    return [row[0] for row in query_index(query, params)]
+
+def trace_req_ids(req_ids=None):
+    """
+    Trace many requirement IDs at once (every known ID if req_ids is None).
+
+    Uses set-based queries (batches of TRACE_BATCH_SIZE IDs), on the query
+    server when one is running. Returns [(req_id, definition, locations)],
+    where definition is [(req_text, source_attribution, flow_file)] or [] and
+    locations is [(filespec, line_num, category)], in the order of req_ids
+    (sorted for all IDs).
+    """
+    definition_query = 'SELECT req_id, req_text, source_attribution, flow_file FROM req_definitions'
+    location_query = 'SELECT req_id, filespec, line_num, category FROM req_locations'
+    location_order = ' ORDER BY req_id, category, filespec, line_num'
+
+    if req_ids is None:
+        batches = [(definition_query, location_query + location_order, ())]
+    else:
+        batches = []
+        unique_ids = list(dict.fromkeys(req_ids))
+        for start in range(0, len(unique_ids), TRACE_BATCH_SIZE):
+            batch = unique_ids[start:start + TRACE_BATCH_SIZE]
+            where = f" WHERE req_id IN ({', '.join('?' * len(batch))})"
+            batches.append((definition_query + where, location_query + where + location_order, batch))
+
+    definitions = {}
+    locations = {}
+    for batch_definition_query, batch_location_query, params in batches:
+        for req_id, req_text, source_attribution, flow_file in query_index(batch_definition_query, params):
+            definitions[req_id] = [(req_text, source_attribution, flow_file)]
+        for req_id, filespec, line_num, category in query_index(batch_location_query, params):
+            locations.setdefault(req_id, []).append((filespec, line_num, category))
+
+    if req_ids is None:
+        req_ids = sorted(set(definitions) | set(locations))
+    return [(req_id, definitions.get(req_id, []), locations.get(req_id, [])) for req_id in req_ids]
+
+def trace_status(definition, locations):
+    """Status word for a traced requirement, as in the STATUS section of the report."""
+    categories = set(category for _, _, category in locations)
+    if not definition:
+        return 'orphan'
+    if 'tests' not in categories:
+        return 'untested'
+    if 'code' not in categories:
+        return 'tested'
+    return 'complete'
+
+def trace_to_dict(req_id, definition, locations):
+    """JSON-friendly form of one trace."""
+    result = {
+        'req_id': req_id,
+        'defined': bool(definition),
+        'req_text': None,
+        'source_attribution': None,
+        'flow_file': None,
+        'status': trace_status(definition, locations),
+        'locations': {'reqs': [], 'tests': [], 'code': []},
+    }
+    if definition:
+        result['req_text'], result['source_attribution'], result['flow_file'] = definition[0]
+    for filespec, line_num, category in locations:
+        result['locations'].setdefault(category, []).append({'filespec': filespec, 'line_num': line_num})
+    return result
 
 def print_report(req_id, definition, locations):
     """Print a formatted report for the requirement."""
@@ -153,32 +254,102 @@ def print_report(req_id, definition, locations):
     print()
     print("=" * 70)
 
+def print_impact(req_ids):
+    """Print everything affected by a change to req_ids, and the tests to re-run."""
+    # The recursive impact queries need a temp table, so they read the database directly
+    conn = open_db()
+    try:
+        affected = dependents(conn, req_ids)
+        test_files = retest_files(conn, req_ids)
+    finally:
+        conn.close()
+
+    print("=" * 70)
+    print(f"IMPACT OF CHANGING: {' '.join(req_ids)}")
+    print("=" * 70)
+    print()
+
+    print("DEPENDENT REQUIREMENTS")
+    print("-" * 70)
+    if affected:
+        for req_id in affected:
+            print(req_id)
+    else:
+        print("(none -- no other requirement references these)")
+    print()
+
+    print("TESTS TO RE-RUN")
+    print("-" * 70)
+    if test_files:
+        for filespec in test_files:
+            print(filespec)
+    else:
+        print("⚠ NO TESTS cover these requirements or their dependents")
+    print()
+    print("=" * 70)
+
+def normalize_req_id(req_id):
+    """Ensure a requirement ID starts with $."""
+    return req_id if req_id.startswith('$') else '$' + req_id
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: reqtrace.py $REQ_ID [$REQ_ID ...]")
-        print()
-        print("Examples:")
-        print("  reqtrace.py $REQ_STARTUP_002")
-        print("  reqtrace.py $REQ_STARTUP_001 $REQ_STARTUP_002")
-        print("  reqtrace.py REQ_STARTUP_003  ($ is optional)")
-        print()
+    parser = argparse.ArgumentParser(
+        description='Trace requirements to their definition, tests and code',
+        epilog='Examples:\n'
+               '  reqtrace.py $REQ_STARTUP_002\n'
+               '  reqtrace.py $REQ_STARTUP_001 $REQ_STARTUP_002\n'
+               '  reqtrace.py REQ_STARTUP_003  ($ is optional)\n'
+               '  reqtrace.py --all --format json\n'
+               '  reqtrace.py "REQ_SEARCH_*" --untested  (glob patterns; quote them)\n'
+               '  reqtrace.py --impact $REQ_STARTUP_001  (dependents and tests to re-run)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('req_ids', nargs='*', metavar='REQ_ID',
+                        help='Requirement IDs or glob patterns (*, ?, [...]) to trace')
+    parser.add_argument('--all', action='store_true', help='Trace every requirement in the index')
+    parser.add_argument('--impact', action='store_true',
+                        help='Show dependents and tests to re-run instead of the trace')
+    parser.add_argument('--untested', action='store_true', help='Only defined requirements without tests')
+    parser.add_argument('--unimplemented', action='store_true', help='Only defined requirements without code')
+    parser.add_argument('--orphan', action='store_true', help='Only requirements tagged but not defined')
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help='Output format (default: text)')
+    args = parser.parse_args()
+
+    if not args.req_ids and not args.all:
+        parser.print_help()
         sys.exit(1)
 
-    req_ids = sys.argv[1:]
+    normalized_ids = None if args.all else [normalize_req_id(req_id) for req_id in args.req_ids]
+    filters = [name for name in COVERAGE_FILTERS if getattr(args, name)]
+    use_patterns = any(c in req_id for req_id in (normalized_ids or []) for c in GLOB_CHARS)
+
+    require_db()
+
+    # Patterns and filters are resolved against the index; plain IDs are
+    # traced as given, so unknown ones are still reported
+    if use_patterns or filters:
+        normalized_ids = select_req_ids(normalized_ids, filters)
+        if not normalized_ids:
+            print("No matching requirements", file=sys.stderr)
+            sys.exit(1)
+
+    if args.impact:
+        if normalized_ids is None:
+            parser.error('--impact needs requirement IDs or patterns')
+        print_impact(normalized_ids)
+        return
+
+    traces = trace_req_ids(normalized_ids)
 
-    # Normalize req_ids to ensure they start with $
-    normalized_ids = []
-    for req_id in req_ids:
-        if not req_id.startswith('$'):
-            req_id = '$' + req_id
-        normalized_ids.append(req_id)
+    if args.format == 'json':
+        print(json.dumps([trace_to_dict(*trace) for trace in traces], ensure_ascii=False, indent=2))
+        return
 
     # Trace each requirement
-    for i, req_id in enumerate(normalized_ids):
+    for i, (req_id, definition, locations) in enumerate(traces):
         if i > 0:
             print("\n\n")  # Spacing between multiple requirements
 
-        definition, locations = trace_req_id(req_id)
         print_report(req_id, definition, locations)
 
 if __name__ == '__main__':
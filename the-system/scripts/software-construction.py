@@ -24,55 +24,48 @@ os.chdir(project_root)
 # Import the agentic coder wrapper
 sys.path.insert(0, str(script_dir))
 from prompt_agentic_coder import get_ai_response_text
+from req_index import build_index, query_index
+from req_id_fixer import fix_unique_req_ids
 
 def run_fix_unique_ids():
-    """Run fix-unique-req-ids.py to auto-fix duplicate IDs."""
+    """Auto-fix duplicate IDs (in-process, see req_id_fixer.py)."""
     print("\n" + "=" * 60)
     print("PRE-CHECK: FIXING DUPLICATE REQ IDs")
     print("=" * 60 + "\n")
 
-    cmd = ['uv', 'run', '--script', './the-system/scripts/fix-unique-req-ids.py']
-    result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=60)
-
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr, file=sys.stderr)
-
-    if result.returncode != 0:
+    try:
+        plan, references = fix_unique_req_ids()
+    except Exception as e:
         print("\n" + "=" * 60)
-        print("EXIT: fix-unique-req-ids.py FAILED")
+        print("EXIT: FIXING DUPLICATE REQ IDs FAILED")
         print("=" * 60)
-        print(f"\nERROR: fix-unique-req-ids.py failed with exit code {result.returncode}\n")
+        print(f"\nERROR: {e}\n")
         sys.exit(1)
 
+    if plan:
+        print(f"\n✓ Fixed {len(plan)} duplicate requirement ID(s), {len(references)} reference(s) updated\n")
+    else:
+        print("✓ No duplicate requirement IDs found\n")
+
 def run_build_req_index():
-    """Run build-req-index.py to rebuild the requirements database."""
+    """Bring the requirements database up to date (in-process, incremental)."""
     print("\n" + "=" * 60)
     print("BUILDING REQUIREMENTS INDEX")
     print("=" * 60 + "\n")
 
-    cmd = ['uv', 'run', '--script', './the-system/scripts/build-req-index.py']
-    result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=60)
-
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr, file=sys.stderr)
-
-    if result.returncode != 0:
+    try:
+        build_index(incremental=True)
+    except Exception as e:
         print("\n" + "=" * 60)
-        print("EXIT: build-req-index.py FAILED")
+        print("EXIT: BUILDING REQUIREMENTS INDEX FAILED")
         print("=" * 60)
-        print(f"\nERROR: build-req-index.py failed with exit code {result.returncode}\n")
+        print(f"\nERROR: {type(e).__name__}: {e}\n")
         sys.exit(1)
+    print()
 
 def query_db(query):
-    """Execute a query against the requirements database."""
-    conn = sqlite3.connect('./tmp/reqs.sqlite')
-    cursor = conn.cursor()
-    cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    """Execute a query against the requirements database (via the query server if running)."""
+    return query_index(query)
 
 def handle_missing_build_script():
     """Create ./tests/build.py based on README.md."""
@@ -394,11 +387,7 @@ def main():
     run_build_req_index()
 
     # Step 4: Remove orphan req_ids
-    orphans = query_db("""
-        SELECT DISTINCT req_id FROM req_locations
-        WHERE category IN ('tests', 'code')
-          AND req_id NOT IN (SELECT req_id FROM req_definitions)
-    """)
+    orphans = query_db("SELECT req_id FROM req_coverage WHERE status = 'orphan'")
     if orphans:
         handle_orphan_req_ids(orphans)
         run_build_req_index()  # Rebuild after cleanup
@@ -406,10 +395,7 @@ def main():
     # Step 5: Write tests for all untested requirements
     tests_were_written = False
     while True:
-        untested = query_db("""
-            SELECT DISTINCT req_id FROM req_definitions
-            WHERE req_id NOT IN (SELECT req_id FROM req_locations WHERE category = 'tests')
-        """)
+        untested = query_db("SELECT req_id FROM req_coverage WHERE status = 'untested'")
         if not untested:
             break
         handle_untested_req(untested)
@@ -6,14 +6,65 @@
 
 """
 Convert SQLite database to JSON format with one row per line.
-Usage: sqlite2json.py <database.sqlite>
+Usage: sqlite2json.py <database.sqlite> [-o OUTPUT[.gz]] [--batch-size N]
+                      [--tables T1,T2] [--columns C1,C2] [--where EXPR]
+                      [--jobs N] [--output-dir DIR [--gzip]] [--shard-rows N]
+                      [--format json|ndjson] [--delta STATE_FILE [--stamp-column C] [--verify]]
+                      [--encoder fast|json|orjson] [--benchmark]
+
+Rows are streamed in batches through a large output buffer, so memory use
+stays constant regardless of database size.
+
+With --jobs, tables (and rowid-range shards of large tables, see
+--shard-rows) are exported concurrently by worker processes, each with its
+own read-only connection. The single output is then assembled in order, so
+it is identical to a serial export. With --output-dir, each table (or shard)
+is written to its own file instead: DIR/<table>.json or DIR/<table>.<n>.json.
+
+--format ndjson drops the wrapper objects and writes one compact
+{"table": ..., "row": {...}} object per line.
+
+--delta STATE_FILE exports only rows added since the run that wrote
+STATE_FILE. Each table's high-water mark is its largest rowid, or the
+largest value of --stamp-column (a strictly increasing modification stamp)
+for tables that have it, which also picks up updated rows. The state also
+holds each table's row count and largest rowid: when fewer of the rows seen
+last time remain (rows were deleted), when the database file was replaced, or
+when a mark went backwards (rebuilt or truncated), the table is exported in
+full and flagged with "reset": true. In rowid mode, rows rewritten in place
+and rowids reused after deleting the last rows go unnoticed; use a stamp
+column, or add --verify to also checksum the rows up to the mark (which
+reads the whole table on every run). Tables with neither a rowid nor the
+stamp column are always exported in full, and WITHOUT ROWID tables with a
+stamp column can't notice deletes.
+
+Rows are encoded by a specialized encoder (--encoder fast, the default)
+whose output is byte-identical to json.dumps() of the row dict. --encoder
+orjson uses the orjson package when it is installed; its output is
+equivalent JSON, but float formatting may differ. --benchmark compares the
+encoders' rows/sec on the given database.
 """
 
+import io
+import os
 import sys
+import gzip
+import shutil
 import sqlite3
 import json
+import argparse
+import tempfile
+import time
+import math
+import hashlib
+import concurrent.futures
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Fix Windows console encoding for Unicode characters
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -30,10 +81,17 @@ def get_table_names(conn):
 def get_table_columns(conn, table_name):
     """Get column names for a table."""
     cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info({table_name})")
+    cursor.execute(f"PRAGMA table_info({quote_identifier(table_name)})")
     return [row[1] for row in cursor.fetchall()]
 
 
+def get_column_types(conn, table_name):
+    """Map column names to their declared types (upper case, '' if none)."""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({quote_identifier(table_name)})")
+    return {row[1]: (row[2] or '').upper() for row in cursor.fetchall()}
+
+
 def convert_value(val):
     """Convert database value to JSON-serializable format."""
     if isinstance(val, bytes):
@@ -47,49 +105,617 @@ def convert_value(val):
     return val
 
 
+# Rows fetched from SQLite per round trip
+DEFAULT_BATCH_SIZE = 1000
+
+# Bytes buffered before each write to the output
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
+def open_output(output_path):
+    """
+    Open the export destination as a buffered UTF-8 text stream.
+
+    None means stdout; a path ending in .gz is gzip-compressed. Newlines are
+    translated the same way print() does on this platform.
+    """
+    if output_path is None:
+        return open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+    if str(output_path).endswith('.gz'):
+        raw = gzip.GzipFile(output_path, 'wb')
+        return io.TextIOWrapper(io.BufferedWriter(raw, OUTPUT_BUFFER_SIZE), encoding='utf-8')
+    return open(output_path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE)
+
+
+def iter_rows(cursor, batch_size):
+    """Yield rows from an executed cursor, fetching batch_size at a time."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def quote_identifier(name):
+    """Quote a table or column name for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect_read_only(db_path):
+    """Open a read-only connection, so concurrent exporters never take write locks."""
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def table_select(table_name, columns, where=None, rowid_range=None, delta=None):
+    """
+    Build the SELECT (and its parameters) for a table or one rowid-range shard of it.
+
+    delta is (column, low, high): only rows with low < column <= high
+    (low None: no lower bound).
+    """
+    query = f"SELECT {', '.join(quote_identifier(c) for c in columns)} FROM {quote_identifier(table_name)}"
+    condition, params = table_conditions(where, rowid_range, delta)
+    if condition:
+        query += " WHERE " + condition
+    return query, params
+
+
+def table_conditions(where=None, rowid_range=None, delta=None):
+    """The WHERE clause (without the keyword) and parameters shared by table_select() and sharding."""
+    conditions = []
+    params = []
+    if where:
+        conditions.append(f"({where})")
+    if rowid_range is not None:
+        conditions.append("rowid >= ? AND rowid < ?")
+        params += list(rowid_range)
+    if delta is not None:
+        column, low, high = delta
+        column = 'rowid' if column == 'rowid' else quote_identifier(column)
+        if low is not None:
+            conditions.append(f"{column} > ?")
+            params.append(low)
+        conditions.append(f"{column} <= ?")
+        params.append(high)
+    return " AND ".join(conditions), params
+
+
+# JSON text of a value, exactly as json.dumps(..., ensure_ascii=False) writes it
+encode_string = json.encoder.encode_basestring
+encode_int = int.__repr__
+
+
+def encode_float(val):
+    if val != val:
+        return 'NaN'
+    if val == math.inf:
+        return 'Infinity'
+    if val == -math.inf:
+        return '-Infinity'
+    return float.__repr__(val)
+
+
+def encode_null(val):
+    return 'null'
+
+
+def encode_bytes(val):
+    return encode_string(convert_value(val))
+
+
+VALUE_ENCODERS = {
+    str: encode_string,
+    int: encode_int,
+    float: encode_float,
+    type(None): encode_null,
+    bytes: encode_bytes,
+}
+
+
+def encode_value(val):
+    """Encode any SQLite value (they are dynamically typed, whatever the declared type)."""
+    return VALUE_ENCODERS[type(val)](val)
+
+
+def column_encoder(declared_type):
+    """
+    Encoder for one column, specialized by its declared type (SQLite affinity
+    rules). Values of any other type still go through encode_value().
+    """
+    if 'INT' in declared_type:
+        expected, encoder = int, encode_int
+    elif any(t in declared_type for t in ('CHAR', 'CLOB', 'TEXT')):
+        expected, encoder = str, encode_string
+    elif any(t in declared_type for t in ('REAL', 'FLOA', 'DOUB')):
+        expected, encoder = float, encode_float
+    else:
+        return encode_value
+
+    def encode(val):
+        return encoder(val) if type(val) is expected else encode_value(val)
+    return encode
+
+
+def make_row_encoder(part):
+    """
+    Build a function turning a row tuple into its output line.
+
+    The keys' JSON text is computed once per column; each row is then joined
+    from precomputed pieces instead of building a dict for json.dumps().
+    """
+    columns = part['columns']
+    types = part.get('types') or {}
+    encoders = [column_encoder(types.get(col, '')) for col in columns]
+
+    if part.get('format') == 'ndjson':
+        prefixes = [encode_string(col) + ':' for col in columns]
+        head = '{"table":' + encode_string(part['table']) + ',"row":{'
+        tail = '}}\n'
+        separator = ','
+    else:
+        prefixes = [encode_string(col) + ': ' for col in columns]
+        # Indent rows with 2 spaces
+        head = '  {'
+        tail = '}\n'
+        separator = ', '
+    pieces = list(zip(prefixes, encoders))
+
+    def encode_row(row):
+        return head + separator.join([prefix + encode(val) for (prefix, encode), val in zip(pieces, row)]) + tail
+    return encode_row
+
+
+def make_orjson_row_encoder(part):
+    """Row encoder using orjson: compact, and floats may be formatted differently."""
+    columns = part['columns']
+    table_name = part['table']
+    ndjson = part.get('format') == 'ndjson'
+
+    def encode_row(row):
+        row_dict = {col: convert_value(val) for col, val in zip(columns, row)}
+        if ndjson:
+            return orjson.dumps({'table': table_name, 'row': row_dict}).decode('utf-8') + '\n'
+        return '  ' + orjson.dumps(row_dict).decode('utf-8') + '\n'
+    return encode_row
+
+
+def write_rows(out, conn, part, batch_size):
+    """Write the row lines of one export part."""
+    query, params = table_select(part['table'], part['columns'], part['where'], part['rowid_range'],
+                                 part.get('delta'))
+    columns = part['columns']
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+
+    encoder = part.get('encoder', 'fast')
+    if encoder != 'json':
+        encode_row = make_orjson_row_encoder(part) if encoder == 'orjson' else make_row_encoder(part)
+        # One write per batch
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            out.write(''.join([encode_row(row) for row in rows]))
+
+    # Reference encoder: a dict and json.dumps() per row
+    if part.get('format') == 'ndjson':
+        for row in iter_rows(cursor, batch_size):
+            row_dict = {col: convert_value(val) for col, val in zip(columns, row)}
+            out.write(json.dumps({'table': part['table'], 'row': row_dict},
+                                 ensure_ascii=False, separators=(',', ':')) + '\n')
+        return
+    for row in iter_rows(cursor, batch_size):
+        row_dict = {col: convert_value(val) for col, val in zip(columns, row)}
+        # Indent rows with 2 spaces
+        out.write('  ' + json.dumps(row_dict, ensure_ascii=False) + '\n')
+
+
+def write_table_start(out, part):
+    table_name = part['table']
+    if part.get('format') == 'ndjson':
+        if part.get('reset'):
+            out.write(json.dumps({'table': table_name, 'reset': True}, separators=(',', ':')) + '\n')
+        return
+    # Start table object (indented with 1 space)
+    reset = '"reset":true,' if part.get('reset') else ''
+    out.write(f' {{"table-name":"{table_name}",{reset}"rows":[\n')
+
+
+def write_table_end(out, part):
+    if part.get('format') == 'ndjson':
+        return
+    # End table object (indented with 1 space)
+    out.write(' ]}\r\n')
+
+
+def write_document_start(out, db_label, output_format):
+    if output_format != 'ndjson':
+        # Start database object
+        out.write(f'{{"sqlite-filespec":"{db_label}","tables":[\n')
+
+
+def write_document_end(out, output_format):
+    if output_format != 'ndjson':
+        # End database object
+        out.write(']}\r\n')
+
+
+def export_part(db_path, db_label, part, path, batch_size, standalone):
+    """
+    Export one part (a table or a shard of one) to path. Runs in worker processes.
+
+    standalone writes a complete document holding just this table; otherwise
+    only the row lines are written, for assembly into the single output.
+    """
+    conn = connect_read_only(db_path)
+    out = open_output(path)
+    try:
+        if standalone:
+            write_document_start(out, db_label, part.get('format'))
+            write_table_start(out, part)
+        write_rows(out, conn, part, batch_size)
+        if standalone:
+            write_table_end(out, part)
+            write_document_end(out, part.get('format'))
+    finally:
+        out.close()
+        conn.close()
+    return path
+
+
+def has_rowid(conn, table_name):
+    """True for ordinary rowid tables (not WITHOUT ROWID or virtual tables)."""
+    try:
+        conn.execute(f"SELECT rowid FROM {quote_identifier(table_name)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def shard_ranges(conn, table_name, where, shard_rows, delta=None):
+    """
+    Split the selected rows of a table into rowid ranges of roughly shard_rows rows each.
+
+    Returns [None] (the whole table) if it is small or has no rowid.
+    """
+    if not shard_rows or not has_rowid(conn, table_name):
+        return [None]
+    query = f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {quote_identifier(table_name)}"
+    condition, params = table_conditions(where, None, delta)
+    if condition:
+        query += " WHERE " + condition
+    count, low, high = conn.execute(query, params).fetchone()
+    if count <= shard_rows:
+        return [None]
+    shard_count = -(-count // shard_rows)
+    step = -(-(high - low + 1) // shard_count)
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+def database_id(db_path):
+    """Identify the database file, so a replaced (rebuilt) database is noticed."""
+    stat = os.stat(db_path)
+    return [stat.st_dev, stat.st_ino]
+
+
+def load_delta_state(state_path):
+    """Read the high-water marks of the previous delta export, or {} on the first run."""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_delta_state(state_path, state):
+    """Write the state file atomically, so an interrupted export never corrupts it."""
+    temp_path = f"{state_path}.tmp-{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, state_path)
+
+
+def rowid_digests(conn, table_name, previous_mark, high):
+    """
+    Fingerprint the rows up to two rowid marks in one ordered scan.
+
+    Returns (digest of rows with rowid <= previous_mark, digest of rows
+    with rowid <= high). previous_mark may be None.
+    """
+    hasher = hashlib.sha256()
+    before = None
+    query = f"SELECT rowid, * FROM {quote_identifier(table_name)} WHERE rowid <= ? ORDER BY rowid"
+    for row in conn.execute(query, (high,)):
+        if before is None and previous_mark is not None and row[0] > previous_mark:
+            before = hasher.hexdigest()
+        hasher.update(repr(row).encode('utf-8'))
+    after = hasher.hexdigest()
+    return before or after, after
+
+
+def plan_delta(conn, table_name, previous, same_database, stamp_column, verify=False):
+    """
+    Decide what a delta export of one table covers.
+
+    previous is the table's entry in the last state file (or None). Returns
+    (delta, reset, entry): delta for table_select() (None = whole table),
+    whether consumers must discard what they had, and the new state entry.
+    verify adds the rowid-mode digest check (see the module docstring).
+    """
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (table_name,)).fetchone()[0] or ''
+    schema_hash = hashlib.sha256(schema.encode('utf-8')).hexdigest()
+
+    rowid = has_rowid(conn, table_name)
+    if stamp_column and stamp_column in get_table_columns(conn, table_name):
+        column = stamp_column
+    elif rowid:
+        column = 'rowid'
+    else:
+        return None, True, {'column': None, 'mark': None, 'schema': schema_hash}
+
+    table = quote_identifier(table_name)
+    mark_expr = 'rowid' if column == 'rowid' else quote_identifier(column)
+    high = conn.execute(f"SELECT MAX({mark_expr}) FROM {table}").fetchone()[0]
+    entry = {'column': column, 'mark': high, 'schema': schema_hash}
+
+    continues = (same_database and previous is not None
+                 and previous.get('column') == column
+                 and previous.get('schema') == schema_hash)
+    previous_mark = previous.get('mark') if continues else None
+    if previous_mark is not None and (high is None or high < previous_mark):
+        continues = False  # Mark went backwards: rebuilt or truncated
+
+    if rowid:
+        entry['rows'], entry['max_rowid'] = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table}").fetchone()
+        if continues and previous.get('rows') != 0:
+            # Updates keep their rowid and inserts get larger ones, so fewer
+            # of last run's rowids means rows were deleted
+            kept = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid <= ?",
+                                (previous.get('max_rowid'),)).fetchone()[0]
+            if kept != previous.get('rows'):
+                continues = False
+
+    if verify and column == 'rowid' and high is not None:
+        before, entry['digest'] = rowid_digests(conn, table_name, previous_mark if continues else None, high)
+        # Compared against the digest of the last --verify run, if any
+        if continues and previous_mark is not None and previous.get('digest', before) != before:
+            continues = False
+
+    if not continues:
+        low, reset = None, True
+    else:
+        # previous_mark is None when the table was empty last time: every row is new
+        low, reset = previous_mark, False
+
+    if high is None:
+        # Empty table: nothing to export; compare against an impossible bound
+        return (column, None, None), reset, entry
+    return (column, low, high), reset, entry
+
+
+def plan_parts(conn, tables, columns, where, shard_rows, output_format='json', delta_state=None,
+               same_database=False, stamp_column=None, encoder='fast', verify=False):
+    """
+    Work out the parts to export, in output order: one per table, or one per shard.
+
+    With delta_state (a dict, updated in place with the new marks) only rows
+    past each table's previous high-water mark are selected.
+    """
+    available = get_table_names(conn)
+    if tables is None:
+        tables = available
+    else:
+        missing = [t for t in tables if t not in available]
+        if missing:
+            raise ValueError(f"No such table(s): {', '.join(missing)}")
+
+    parts = []
+    for table_name in tables:
+        table_columns = get_table_columns(conn, table_name)
+        if columns is not None:
+            missing = [c for c in columns if c not in table_columns]
+            if missing:
+                raise ValueError(f"Table {table_name} has no column(s): {', '.join(missing)}")
+            table_columns = list(columns)
+        delta, reset = None, False
+        if delta_state is not None:
+            previous = delta_state['tables'].get(table_name)
+            delta, reset, delta_state['tables'][table_name] = plan_delta(
+                conn, table_name, previous, same_database, stamp_column, verify)
+        ranges = shard_ranges(conn, table_name, where, shard_rows, delta)
+        table_types = get_column_types(conn, table_name)
+        for shard, rowid_range in enumerate(ranges):
+            parts.append({
+                'table': table_name,
+                'columns': table_columns,
+                'where': where,
+                'rowid_range': rowid_range,
+                'shard': shard if len(ranges) > 1 else None,
+                'format': output_format,
+                'encoder': encoder,
+                'types': table_types,
+                'delta': delta,
+                # Announced once per table, with its first part
+                'reset': reset and shard == 0,
+            })
+    return parts
+
+
+def run_parts(jobs, tasks):
+    """Run export_part over tasks, in a process pool when jobs > 1."""
+    if jobs <= 1 or len(tasks) <= 1:
+        return [export_part(*task) for task in tasks]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(export_part, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def run_benchmark(db_path, parts, batch_size):
+    """Encode every selected row with each available encoder and report rows/sec."""
+    encoders = ['json', 'fast'] + (['orjson'] if orjson is not None else [])
+    conn = connect_read_only(db_path)
+    try:
+        row_count = 0
+        for part in parts:
+            query, params = table_select(part['table'], part['columns'], part['where'],
+                                         part['rowid_range'], part.get('delta'))
+            row_count += conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+        print(f"Encoding {row_count:,} rows from {db_path} ({parts[0]['format'] if parts else 'json'} format)")
+        timings = {}
+        for encoder in encoders:
+            out = io.StringIO()
+            start_time = time.perf_counter()
+            for part in parts:
+                write_rows(out, conn, dict(part, encoder=encoder), batch_size)
+            timings[encoder] = time.perf_counter() - start_time
+            if encoder == 'json':
+                reference = out.getvalue()
+            identical = 'identical' if out.getvalue() == reference else 'differs from json'
+            rate = row_count / timings[encoder] if timings[encoder] else 0
+            print(f"  {encoder:<7} {timings[encoder]:7.2f} s  {rate:12,.0f} rows/s  "
+                  f"{timings['json'] / timings[encoder]:5.2f}x  ({identical})")
+    finally:
+        conn.close()
+
+
+def split_list(value):
+    """Parse a comma-separated option value."""
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: sqlite2json.py <database.sqlite>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Convert SQLite database to JSON format with one row per line')
+    parser.add_argument('database', help='SQLite database file')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Write to this file instead of stdout (.gz suffix compresses)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows fetched per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--tables', default=None, help='Comma-separated tables to export (default: all)')
+    parser.add_argument('--columns', default=None, help='Comma-separated columns to export from each table')
+    parser.add_argument('--where', default=None, help='SQL condition applied to every exported table')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes exporting tables/shards concurrently (default: 1)')
+    parser.add_argument('--output-dir', default=None,
+                        help='Write one file per table (or shard) into this directory instead of one output')
+    parser.add_argument('--gzip', action='store_true', help='Compress the files written to --output-dir')
+    parser.add_argument('--shard-rows', type=int, default=None,
+                        help='Split tables with more rows than this into rowid-range shards')
+    parser.add_argument('--format', choices=('json', 'ndjson'), default='json',
+                        help='json: the wrapped document (default); ndjson: one compact object per row')
+    parser.add_argument('--delta', default=None, metavar='STATE_FILE',
+                        help='Export only rows added since the export that wrote STATE_FILE, then update it')
+    parser.add_argument('--stamp-column', default=None,
+                        help='With --delta: strictly increasing modification stamp column to use instead of rowid')
+    parser.add_argument('--verify', action='store_true',
+                        help='With --delta: checksum the rows up to each rowid mark, so rows rewritten in place '
+                             'force a reset (reads the whole table)')
+    parser.add_argument('--encoder', choices=('fast', 'json', 'orjson'), default='fast',
+                        help='Row encoder: fast (default, same bytes as json), json (reference), '
+                             'orjson (needs the orjson package)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare row encoders on the selected tables instead of exporting')
+    args = parser.parse_args()
 
-    db_path = Path(sys.argv[1])
+    db_path = Path(args.database)
 
     if not db_path.exists():
         print(f"Error: Database file not found: {db_path}", file=sys.stderr)
         sys.exit(1)
+    if args.output and args.output_dir:
+        print("Error: --output and --output-dir are mutually exclusive", file=sys.stderr)
+        sys.exit(1)
+    if args.encoder == 'orjson' and orjson is None:
+        print("Error: --encoder orjson needs the orjson package (pip install orjson)", file=sys.stderr)
+        sys.exit(1)
+    if args.benchmark and args.delta:
+        print("Error: --benchmark can't be combined with --delta", file=sys.stderr)
+        sys.exit(1)
 
-    conn = sqlite3.connect(str(db_path))
+    delta_state = None
+    same_database = False
+    if args.delta:
+        previous_state = load_delta_state(args.delta)
+        current_id = database_id(db_path)
+        same_database = (previous_state.get('database') == str(db_path.resolve())
+                         and previous_state.get('database_id') == current_id)
+        delta_state = {
+            'database': str(db_path.resolve()),
+            'database_id': current_id,
+            # Tables not exported this time keep their marks only if the database is the same
+            'tables': dict(previous_state.get('tables', {})) if same_database else {},
+        }
 
-    # Start database object
-    print(f'{{"sqlite-filespec":"{db_path}","tables":[')
+    conn = connect_read_only(db_path)
+    try:
+        # One read transaction, so the marks and the rows come from the same snapshot
+        conn.execute('BEGIN')
+        parts = plan_parts(conn, split_list(args.tables), split_list(args.columns), args.where, args.shard_rows,
+                           args.format, delta_state, same_database, args.stamp_column, args.encoder,
+                           args.verify)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    table_names = get_table_names(conn)
+    if args.benchmark:
+        conn.close()
+        run_benchmark(db_path, parts, args.batch_size)
+        return
 
-    for table_idx, table_name in enumerate(table_names):
-        columns = get_table_columns(conn, table_name)
+    # One file per table or shard
+    if args.output_dir:
+        conn.close()
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        suffix = '.json.gz' if args.gzip else '.json'
+        tasks = []
+        for part in parts:
+            name = part['table'] if part['shard'] is None else f"{part['table']}.{part['shard']}"
+            tasks.append((str(db_path), str(db_path), part, str(output_dir / (name + suffix)), args.batch_size, True))
+        for path in run_parts(args.jobs, tasks):
+            print(path, file=sys.stderr)
+        if delta_state is not None:
+            save_delta_state(args.delta, delta_state)
+        return
 
-        # Start table object (indented with 1 space)
-        print(f' {{"table-name":"{table_name}","rows":[')
+    out = open_output(args.output)
 
-        # Query all rows
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table_name}")
+    write_document_start(out, db_path, args.format)
 
-        for row in cursor.fetchall():
-            row_dict = {col: convert_value(val) for col, val in zip(columns, row)}
-            # Indent rows with 2 spaces
-            print('  ' + json.dumps(row_dict, ensure_ascii=False))
+    if args.jobs > 1 and len(parts) > 1:
+        # Export parts concurrently into temp files, then splice them in order
+        conn.close()
+        temp_dir = tempfile.mkdtemp(prefix='sqlite2json-')
+        try:
+            tasks = [(str(db_path), str(db_path), part, os.path.join(temp_dir, f"part-{i:05d}.json"),
+                      args.batch_size, False) for i, part in enumerate(parts)]
+            paths = run_parts(args.jobs, tasks)
+            for i, (part, path) in enumerate(zip(parts, paths)):
+                if i == 0 or parts[i - 1]['table'] != part['table']:
+                    write_table_start(out, part)
+                out.flush()
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, out.buffer, OUTPUT_BUFFER_SIZE)
+                if i == len(parts) - 1 or parts[i + 1]['table'] != part['table']:
+                    write_table_end(out, part)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    else:
+        for i, part in enumerate(parts):
+            if i == 0 or parts[i - 1]['table'] != part['table']:
+                write_table_start(out, part)
+            write_rows(out, conn, part, args.batch_size)
+            if i == len(parts) - 1 or parts[i + 1]['table'] != part['table']:
+                write_table_end(out, part)
+        conn.close()
 
-        # End table object (indented with 1 space)
-        if table_idx < len(table_names) - 1:
-            print(' ]}\r')
-        else:
-            print(' ]}\r')
+    write_document_end(out, args.format)
 
-    # End database object
-    print(']}\r')
+    out.close()
 
-    conn.close()
+    # Only after everything was written, so a failed export is repeated in full
+    if delta_state is not None:
+        save_delta_state(args.delta, delta_state)
 
 
 if __name__ == '__main__':
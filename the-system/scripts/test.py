@@ -144,10 +144,34 @@ def write_report(test_filename, exit_code, output):
 
     return report_path
 
+def find_impacted_tests(req_ids):
+    """Update the requirements index and return the test files to re-run for req_ids."""
+    sys.path.insert(0, str(script_dir))
+    from req_index import build_index, retest_files, DB_PATH
+    import sqlite3
+
+    req_ids = [req_id if req_id.startswith('$') else '$' + req_id for req_id in req_ids]
+    build_index(incremental=True, quiet=True)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        test_files = retest_files(conn, req_ids)
+    finally:
+        conn.close()
+
+    # Only tests that still exist in passing/ or failing/
+    test_files = [f for f in test_files
+                  if os.path.exists(f) and Path(f).parent.name in ('passing', 'failing')]
+    print(f"\nImpact of {' '.join(req_ids)}: {len(test_files)} test file(s)")
+    for test_file in test_files:
+        print(f"  {test_file}")
+    return test_files
+
 def main():
     parser = argparse.ArgumentParser(description='Run tests with build step')
     parser.add_argument('--passing', action='store_true', help='Run only passing tests')
     parser.add_argument('--failing', action='store_true', help='Run only failing tests')
+    parser.add_argument('--impact', nargs='+', metavar='REQ_ID',
+                        help='Run only the tests affected by a change to these requirements')
     parser.add_argument('test_file', nargs='?', help='Specific test file to run')
 
     args = parser.parse_args()
@@ -189,6 +213,13 @@ def main():
             print("\nNo tests found")
             sys.exit(0)
 
+    impacted_tests = None
+    if args.impact:
+        impacted_tests = find_impacted_tests(args.impact)
+        if not impacted_tests:
+            print("\nNo tests cover these requirements or their dependents")
+            sys.exit(0)
+
     # Step 3: Run tests directly (no pytest)
     if args.test_file:
         # Run single test file
@@ -204,7 +235,10 @@ def main():
     else:
         # Run all tests in directory
         import glob
-        test_files = glob.glob(f'{test_target}/test_*.py') + glob.glob(f'{test_target}/_test_*.py')
+        if impacted_tests is not None:
+            test_files = impacted_tests
+        else:
+            test_files = glob.glob(f'{test_target}/test_*.py') + glob.glob(f'{test_target}/_test_*.py')
         if not test_files:
             print(f"\nNo test files found in {test_target}")
             return 0